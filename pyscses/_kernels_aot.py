@@ -0,0 +1,57 @@
+"""Ahead-of-time compilation of the pyscses compiled kernels.
+
+The functions exported here are compiled with `numba.pycc` into the extension module
+`pyscses.pyscses_kernels`, so that importing pyscses does not need to JIT-compile them.
+The extension is built by `setup.py` when Numba is available, or by running this module directly::
+
+    python -m pyscses._kernels_aot
+
+If the extension module is not present, or was built from different source (see `pyscses._numba.kernel_source_hash()`),
+pyscses falls back to the equivalent JIT-compiled (or pure Python) functions.
+"""
+import os
+import numpy as np
+from numba import njit # type: ignore
+from numba.pycc import CC # type: ignore
+from pyscses.grid import _closest_index_nb, _hunt_closest_index_nb
+from pyscses.site import _charge_of_site_kernel, _site_charge
+from pyscses._numba import kernel_source_hash
+
+cc = CC('pyscses_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+_source_hash = kernel_source_hash()
+
+@cc.export('source_hash', 'i8()')
+def source_hash():
+    return _source_hash
+
+_charge_of_site = njit(_charge_of_site_kernel)
+
+@cc.export('closest_index_f8', 'i8(f8[:], f8)')
+def closest_index_f8(grid, x):
+    return _closest_index_nb(grid, x)
+
+@cc.export('hunt_closest_index_f8', 'i8(f8[:], f8, i8)')
+def hunt_closest_index_f8(grid, x, guess):
+    return _hunt_closest_index_nb(grid, x, guess)
+
+@cc.export('site_charge', 'f8(f8[:], f8[:], f8[:], b1[:], f8, f8[:], f8, f8, f8)')
+def site_charge(valences, mole_fractions, energies, mobile_mask, alpha, scaling, site_valence, phi, temp):
+    return _site_charge(valences, mole_fractions, energies, mobile_mask, alpha, scaling, site_valence, phi, temp)
+
+# Serial equivalent of the parallel gufunc built by `pyscses.site.charges_of_sites()`,
+# which is only used if Numba is not installed at runtime.
+@cc.export('site_charges', 'f8[:](f8[:,:], f8[:,:], f8[:,:], b1[:,:], f8[:], f8[:,:], f8[:], f8[:], f8)')
+def site_charges(valences, mole_fractions, energies, mobile_mask, alpha, scaling, site_valences, phi, temp):
+    n_sites = valences.shape[0]
+    charges = np.empty(n_sites)
+    charge = np.empty(1)
+    for i in range(n_sites):
+        _charge_of_site(valences[i], mole_fractions[i], energies[i], mobile_mask[i],
+                        alpha[i], scaling[i], site_valences[i], phi[i], temp, charge)
+        charges[i] = charge[0]
+    return charges
+
+if __name__ == '__main__':
+    cc.compile()
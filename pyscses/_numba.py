@@ -0,0 +1,61 @@
+"""Optional Numba support.
+
+If Numba is installed, `njit` and `guvectorize` are the Numba decorators.
+Otherwise `njit` is a no-op decorator, so the decorated functions run as plain Python,
+and `guvectorize` is None; callers check `NUMBA_AVAILABLE` and provide a numpy fallback.
+
+`aot_kernels` is the extension module built ahead of time by `pyscses._kernels_aot`,
+or None if it has not been built, or was built from different source to the installed modules.
+Callers use it in preference to the JIT-compiled functions, which avoids compiling them at runtime.
+"""
+import hashlib
+import os
+import warnings
+
+try:
+    from numba import njit, guvectorize # type: ignore
+    NUMBA_AVAILABLE = True
+except ImportError: # pragma: no cover
+    NUMBA_AVAILABLE = False
+    guvectorize = None
+
+    def njit(*args, **kwargs): # type: ignore
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        def decorator(func):
+            return func
+        return decorator
+
+# Modules whose source is compiled into the ahead-of-time kernels.
+_aot_kernel_sources = ('_kernels_aot.py', 'constants.py', 'grid.py', 'site.py')
+
+def kernel_source_hash() -> int:
+    """Returns a hash of the source of the modules compiled into the ahead-of-time kernels.
+
+    The hash is compiled into the extension module by `pyscses._kernels_aot`, so that an extension
+    built from different source can be detected. Any change to these modules changes the hash.
+
+    Returns:
+        int: The hash, as a (positive) 64-bit integer.
+
+    """
+    digest = hashlib.sha1()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for filename in _aot_kernel_sources:
+        with open(os.path.join(directory, filename), 'rb') as f:
+            digest.update(f.read())
+    return int(digest.hexdigest()[:15], 16)
+
+def _load_aot_kernels():
+    """Returns the ahead-of-time compiled kernels module, or None if it has not been built or is out of date."""
+    try:
+        from pyscses import pyscses_kernels # type: ignore
+    except ImportError:
+        return None
+    if getattr(pyscses_kernels, 'source_hash', lambda: None)() != kernel_source_hash():
+        warnings.warn("The compiled pyscses kernels were built from different source and will not be used. "
+                      "Rebuild them with `python -m pyscses._kernels_aot`.", RuntimeWarning)
+        return None
+    return pyscses_kernels
+
+aot_kernels = _load_aot_kernels()
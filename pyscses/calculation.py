@@ -254,10 +254,9 @@ class Calculation:
                 predicted_phi -= average_phi
             elif approximation == 'mott-schottky':
                 subgrid = self.grid.subgrid(self.site_labels[0])
-                predicted_phi_subgrid = np.array([phi_at_x(phi=predicted_phi,
-                                                   coordinates=self.grid.x,
-                                                   x=x)
-                                            for x in subgrid.x])
+                predicted_phi_subgrid = phi_at_x(phi=predicted_phi,
+                                                 coordinates=self.grid.lookup_indexer,
+                                                 x=subgrid.x)
                 average_predicted_phi = self.calculate_average(grid=subgrid,
                                                        min_cutoff=self.bulk_x_min,
                                                        max_cutoff=self.bulk_x_max,
@@ -266,7 +265,7 @@ class Calculation:
             # TODO: This is inefficient. Jacob has some ideas for how to improve things.
             # TODO: This definition of convergence should not be averaged over all sites.
             phi =  self.alpha * predicted_phi + ( 1.0 - self.alpha ) * phi
-            conv = sum((predicted_phi - phi )**2) / len(self.grid.x)
+            conv = np.sum((predicted_phi - phi )**2) / len(self.grid.x)
             # prob = self.grid.set_of_sites.calculate_probabilities( self.grid, phi, self.temp) # Jacob: Does this do anything?
             niter += 1
             if verbose:
@@ -335,7 +334,7 @@ class Calculation:
 
 	"""
         space_charge_region = []
-        self.phi_on_mobile_defect_grid = [ phi_at_x( self.phi, self.grid.x, x ) for x in grid.x ]
+        self.phi_on_mobile_defect_grid = phi_at_x( self.phi, self.grid.lookup_indexer, grid.x )
         x_and_phi = np.column_stack( ( grid.x, self.phi_on_mobile_defect_grid ) )
         for i in range( len( x_and_phi ) ):
             if pos_or_neg_scr == 'positive':
@@ -375,7 +374,7 @@ class Calculation:
         for site in space_charge_region_sites:
             charge = site.defects[0].valence
             mobilities = site.defects[0].mobility
-        space_charge_region_grid = Grid.from_set_of_sites( space_charge_region_sites, space_charge_region_limits, space_charge_region_limits, self.grid.b, self.grid.c )
+        space_charge_region_grid = Grid.from_set_of_sites( space_charge_region_sites, space_charge_region_limits, space_charge_region_limits, self.grid.b, self.grid.c, self.grid.grid_dtype )
         space_charge_region_width = space_charge_region_grid.x[-1] - space_charge_region_grid.x[0]
         mobile_defect_density = self.subgrids[species].set_of_sites.subgrid_calculate_defect_density( self.subgrids[species], self.grid, self.phi, self.temp )
         space_charge_region_mobile_defect_mf = space_charge_region_sites.calculate_probabilities( space_charge_region_grid, self.phi, self.temp )
@@ -393,7 +392,7 @@ class Calculation:
         min_bulk_index, max_bulk_index = self.find_index( self.subgrids[species], self.bulk_x_min, bulk_x_max )
         self.bulk_limits = self.calculate_offset( self.subgrids[species], self.bulk_x_min, bulk_x_max )
         bulk_mobile_defect_sites = self.create_subregion_sites( self.subgrids[species], self.bulk_x_min, bulk_x_max )
-        bulk_mobile_defect_grid = Grid.from_set_of_sites( bulk_mobile_defect_sites, self.bulk_limits, self.bulk_limits, self.grid.b, self.grid.c )
+        bulk_mobile_defect_grid = Grid.from_set_of_sites( bulk_mobile_defect_sites, self.bulk_limits, self.bulk_limits, self.grid.b, self.grid.c, self.grid.grid_dtype )
         bulk_mobile_defect_density = bulk_mobile_defect_grid.set_of_sites.subgrid_calculate_defect_density( bulk_mobile_defect_grid, self.grid, self.phi, self.temp )
         bulk_region_mobile_defect_mf = bulk_mobile_defect_sites.calculate_probabilities(bulk_mobile_defect_grid, self.phi, self.temp)
         # TODO: According to Jacob this only scales the mobility of space-charge region but not the
@@ -408,11 +407,11 @@ class Calculation:
         # TODO: Jacob has fixed this!!
         # TODO: Should be refactored into its own function.
         if mobilities != 0.0:
-            space_charge_perpendicular = sum( space_charge_region_grid.delta_x / mobile_defect_conductivity )
-            self.average_bulk_mobile_defect_density = sum(bulk_mobile_defect_grid.delta_x * bulk_mobile_defect_density ) / sum(bulk_mobile_defect_grid.delta_x)
-            bulk_perpendicular = sum( bulk_mobile_defect_conductivity / bulk_mobile_defect_grid.delta_x )
-            space_charge_parallel = sum( mobile_defect_conductivity / space_charge_region_grid.delta_x )
-            bulk_parallel = sum( bulk_mobile_defect_grid.delta_x / bulk_mobile_defect_conductivity )
+            space_charge_perpendicular = np.sum( space_charge_region_grid.delta_x / mobile_defect_conductivity )
+            self.average_bulk_mobile_defect_density = np.dot(bulk_mobile_defect_grid.delta_x, bulk_mobile_defect_density ) / np.sum(bulk_mobile_defect_grid.delta_x)
+            bulk_perpendicular = np.sum( bulk_mobile_defect_conductivity / bulk_mobile_defect_grid.delta_x )
+            space_charge_parallel = np.sum( mobile_defect_conductivity / space_charge_region_grid.delta_x )
+            bulk_parallel = np.sum( bulk_mobile_defect_grid.delta_x / bulk_mobile_defect_conductivity )
             perpendicular_conductivity_ratio = 1 / ( space_charge_perpendicular * bulk_perpendicular )
             parallel_conductivity_ratio = space_charge_parallel * bulk_parallel
         else:
@@ -23,6 +23,8 @@ class DefectAtSite:
         site (:obj:`Site`): The pyscses.Site object that corresponding to each defect at each x coordinate.
         fixed (bool): set whether this defect species can redistribute to an equilibrium distribution. Default=False.
 
+    Changing `label`, `valence`, `mole_fraction`, `energy` or `fixed` updates the per-defect data cached by the parent `Site`.
+
     """
     def __init__(self,
                  label: str,
@@ -32,13 +34,58 @@ class DefectAtSite:
                  energy: float,
                  site: Site,
                  fixed: bool = False) -> None:
-        self.label = label
-        self.valence = valence
-        self.mole_fraction = mole_fraction
+        self._label = label
+        self._valence = valence
+        self._mole_fraction = mole_fraction
         self.mobility = mobility
-        self.energy = energy
+        self._energy = energy
         self.site = site
-        self.fixed = fixed
+        self._fixed = fixed
+
+    @property
+    def label(self) -> str:
+        return self._label
+
+    @label.setter
+    def label(self, value: str) -> None:
+        self._label = value
+        self.site.update_defect_arrays()
+
+    @property
+    def valence(self) -> float:
+        return self._valence
+
+    @valence.setter
+    def valence(self, value: float) -> None:
+        self._valence = value
+        self.site.update_defect_arrays()
+
+    @property
+    def mole_fraction(self) -> float:
+        return self._mole_fraction
+
+    @mole_fraction.setter
+    def mole_fraction(self, value: float) -> None:
+        self._mole_fraction = value
+        self.site.update_defect_arrays()
+
+    @property
+    def energy(self) -> float:
+        return self._energy
+
+    @energy.setter
+    def energy(self, value: float) -> None:
+        self._energy = value
+        self.site.update_defect_arrays()
+
+    @property
+    def fixed(self) -> bool:
+        return self._fixed
+
+    @fixed.setter
+    def fixed(self, value: bool) -> None:
+        self._fixed = value
+        self.site.update_defect_arrays()
 
     def potential_energy(self,
                          phi: float) -> float:
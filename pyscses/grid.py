@@ -1,29 +1,32 @@
 from __future__ import annotations
 import numpy as np
 import math
+from operator import attrgetter
 from pyscses.constants import boltzmann_eV
-from bisect import bisect_left
 from scipy.interpolate import griddata # type: ignore
-from typing import Union, Tuple, List
+from typing import Union, Tuple, List, Optional
 from pyscses.grid_point import GridPoint
 from pyscses.defect_species import DefectSpecies
+from pyscses.site import Site, defect_arrays_for_sites, charges_of_sites
+from pyscses._numba import njit, aot_kernels
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from pyscses.set_of_sites import SetOfSites
 
 def phi_at_x(phi: np.ndarray,
-             coordinates: np.ndarray,
-             x: float) -> float:
+             coordinates: Union[np.ndarray, GridIndexer],
+             x: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
     """
     Assigns each site x coordinate a grid point and returns the electrostatic potential at the grid point closest to the x coordinate.
 
     Args:
         phi (np.array): electrostatic potential on 1D grid.
-        coordinates (np.array): 1D grid of ordered numbers over a region.
-        x (float): Site x coordinate.
+        coordinates (np.array or GridIndexer): 1D grid of ordered numbers over a region, or a GridIndexer for the grid
+            (e.g. `Grid.lookup_indexer`).
+        x (float or np.array): Site x coordinate, or an array of site x coordinates.
 
     Returns:
-        float: The electrostatic potential at the x coordinate with position [index].
+        float or np.array: The electrostatic potential at the x coordinate(s) with position [index].
 
     """
     index = index_of_grid_at_x(coordinates, x)
@@ -47,20 +50,33 @@ def energy_at_x(energy: np.ndarray,
     index = index_of_grid_at_x(coordinates, x)
     return energy[index]
 
-def index_of_grid_at_x(coordinates: np.ndarray,
-                       x: float) -> int:
+def index_of_grid_at_x(coordinates: Union[np.ndarray, GridIndexer],
+                       x: Union[float, np.ndarray]) -> Union[int, np.ndarray]:
     """Assigns each site x coordinate to a position on a regularly or irregularly spaced grid.
 
     Returns the index of the grid point closest to the value x
 
     Args:
-        coordinates (np.array): arraylike ordered list of x coordinates.
-        x (float): x coordinate.
+        coordinates (np.array or GridIndexer): arraylike ordered list of x coordinates, or a GridIndexer for them
+            (e.g. `Grid.lookup_indexer`). Repeated lookups on the same grid are fastest with a GridIndexer.
+        x (float or np.array): x coordinate, or an array of x coordinates.
 
     Returns:
-        int: Index of the coordinates array at the position closest to the input x coordinate.
+        int or np.array: Index of the coordinates array at the position closest to the input x coordinate(s).
 
     """
+    if isinstance(coordinates, GridIndexer):
+        if np.ndim(x) > 0:
+            return coordinates.indices(x)
+        return coordinates(x)
+    if isinstance(coordinates, np.ndarray):
+        if np.ndim(x) > 0:
+            return GridIndexer(coordinates).indices(x)
+        if aot_kernels is not None and coordinates.dtype == np.float64:
+            return aot_kernels.closest_index_f8(coordinates, x)
+        return _closest_index_nb(coordinates, x)
+    if np.ndim(x) > 0:
+        return closest_indices(coordinates, x)
     return closest_index(coordinates, x)
 
 def closest_index(myList: Union[list[float], np.ndarray],
@@ -78,12 +94,22 @@ def closest_index(myList: Union[list[float], np.ndarray],
         pos (int): Index of position of number in myList which is closest to myNumber.
 
     """
-    myList = list(myList)
-    pos = bisect_left(myList, myNumber)
+    n = len(myList)
+    if n == 0:
+        return 0
+    # Lower-bound search with a fixed ceil(log2(n)) iterations and no
+    # data-dependent branches inside the loop.
+    pos = 0
+    size = n
+    while size > 1:
+        half = size >> 1
+        pos = pos + half if myList[pos + half] < myNumber else pos
+        size -= half
+    pos += int(myList[pos] < myNumber)
     if pos == 0:
         return 0
-    if pos == len(myList):
-        return (len(myList) - 1)
+    if pos == n:
+        return n - 1
     before = myList[pos - 1]
     after = myList[pos]
     if after - myNumber < myNumber - before:
@@ -91,6 +117,231 @@ def closest_index(myList: Union[list[float], np.ndarray],
     else:
        return pos - 1
 
+@njit(cache=True, fastmath=True)
+def _closest_index_nb(grid: np.ndarray,
+                      x: float) -> int:
+    """Compiled equivalent of `closest_index` for a sorted numpy array.
+
+    The lower-bound search runs a fixed number of iterations and updates
+    `low` by conditional assignment rather than branching.
+
+    Args:
+        grid (np.array): Sorted array of numbers to compare against.
+        x (float): The number to compare against grid.
+
+    Returns:
+        int: Index of the value in grid which is closest to x.
+
+    """
+    n = grid.shape[0]
+    low = 0
+    size = n
+    while size > 1:
+        half = size >> 1
+        low = low + half if grid[low + half] < x else low
+        size -= half
+    if grid[low] < x:
+        low += 1
+    return _closest_index_from_lower_bound(grid, x, low)
+
+@njit(cache=True)
+def _hunt_closest_index_nb(grid: np.ndarray,
+                           x: float,
+                           guess: int) -> int:
+    """Compiled equivalent of `closest_index` that starts searching from a guessed index.
+
+    The search steps away from `guess` in strides of 1, 2, 4, ... until x is
+    bracketed, then bisects within the bracket. This takes O(log d) comparisons,
+    where d is the distance from `guess` to the result, so it is fast for a
+    sequence of nearby lookups.
+
+    Args:
+        grid (np.array): Sorted array of numbers to compare against.
+        x (float): The number to compare against grid.
+        guess (int): Index to start the search from, e.g. the result of the previous lookup.
+
+    Returns:
+        int: Index of the value in grid which is closest to x.
+
+    """
+    n = grid.shape[0]
+    if guess < 0 or guess >= n:
+        return _closest_index_nb(grid, x)
+    # Bracket the lower bound of x (the first index with grid[i] >= x) in (lo, hi].
+    step = 1
+    if grid[guess] < x:
+        lo = guess
+        hi = lo + step
+        while hi < n and grid[hi] < x:
+            lo = hi
+            step *= 2
+            hi = lo + step
+        if hi > n:
+            hi = n
+    else:
+        hi = guess
+        lo = hi - step
+        while lo >= 0 and grid[lo] >= x:
+            hi = lo
+            step *= 2
+            lo = hi - step
+        if lo < -1:
+            lo = -1
+    lo += 1
+    while lo < hi:
+        mid = (lo + hi) >> 1
+        if grid[mid] < x:
+            lo = mid + 1
+        else:
+            hi = mid
+    return _closest_index_from_lower_bound(grid, x, lo)
+
+@njit(cache=True, fastmath=True)
+def _closest_index_from_lower_bound(grid: np.ndarray,
+                                    x: float,
+                                    pos: int) -> int:
+    """Returns the index of the value in grid closest to x, given the lower bound of x in grid.
+
+    Args:
+        grid (np.array): Sorted array of numbers to compare against.
+        x (float): The number to compare against grid.
+        pos (int): Index of the first value in grid that is not less than x (len(grid) if there is none).
+
+    Returns:
+        int: Index of the value in grid which is closest to x.
+
+    """
+    n = grid.shape[0]
+    if pos == 0:
+        return 0
+    if pos == n:
+        return n - 1
+    if grid[pos] - x < x - grid[pos - 1]:
+        return pos
+    return pos - 1
+
+# Compile (or load from the cache) at import, rather than on the first lookup.
+# Not needed if the ahead-of-time compiled kernels are available.
+if aot_kernels is None:
+    _closest_index_nb(np.array([0.0, 1.0]), 0.5)
+    _hunt_closest_index_nb(np.array([0.0, 1.0]), 0.5, 0)
+
+def closest_indices(coordinates: Union[list[float], np.ndarray],
+                    xs: np.ndarray) -> np.ndarray:
+    """Returns the indices of the closest values in coordinates to each value in xs.
+
+    Vectorised equivalent of `closest_index` for an array of query values.
+    Assumes coordinates is sorted.
+    If two numbers are equally close, return the index of the smallest number.
+
+    Args:
+        coordinates (np.array): Sorted array of numbers to compare against.
+        xs (np.array): The numbers to compare against coordinates.
+
+    Returns:
+        np.array: Index of the closest value in coordinates for each value in xs.
+
+    """
+    coordinates = np.asarray(coordinates)
+    xs = np.asarray(xs)
+    n = len(coordinates)
+    pos = np.searchsorted(coordinates, xs, side='left')
+    inner = np.clip(pos, 1, max(n - 1, 1))
+    before = coordinates[inner - 1]
+    after = coordinates[np.minimum(inner, n - 1)]
+    indices = np.where(after - xs < xs - before, inner, inner - 1)
+    indices[pos == 0] = 0
+    indices[pos == n] = n - 1
+    return indices
+
+class GridIndexer:
+    """Finds the index of the grid point closest to a given x coordinate.
+
+    If the grid is uniformly spaced the index is calculated directly from the grid spacing.
+    Otherwise the search starts from the index returned by the previous call,
+    which is fast when successive lookups are close together (e.g. iterating over sites in order).
+
+    Attributes:
+        coordinates (np.array): Sorted 1D grid of x coordinates.
+        uniform (bool): True if the grid is uniformly spaced.
+
+    """
+
+    def __init__(self,
+                 coordinates: np.ndarray) -> None:
+        """Initialise a GridIndexer object.
+
+        Args:
+            coordinates (np.array): Sorted 1D grid of x coordinates.
+
+        """
+        self.coordinates = coordinates
+        self._n = len(coordinates)
+        self._last = 0
+        self._use_aot = aot_kernels is not None and coordinates.dtype == np.float64
+        # Single precision coordinates (see `lookup_coordinates()`) are compared with single precision x values.
+        self._single = coordinates.dtype == np.float32
+        if self._n > 1:
+            self._x0 = coordinates[0]
+            self._dx = coordinates[1] - coordinates[0]
+            self.uniform = bool(self._dx > 0.0 and
+                                np.allclose(np.diff(coordinates), self._dx, rtol=1e-9, atol=0.0))
+        else:
+            self.uniform = False
+
+    def __call__(self,
+                 x: float) -> int:
+        """Returns the index of the grid point closest to x.
+
+        Args:
+            x (float): x coordinate.
+
+        Returns:
+            int: Index of the grid point closest to x.
+
+        """
+        if self._single:
+            x = np.float32(x)
+        if not self.uniform:
+            if self._use_aot:
+                self._last = aot_kernels.hunt_closest_index_f8(self.coordinates, x, self._last)
+            else:
+                self._last = _hunt_closest_index_nb(self.coordinates, x, self._last)
+            return self._last
+        c = self.coordinates
+        n = self._n
+        i = min(max(math.ceil((x - self._x0) / self._dx - 0.5), 0), n - 1)
+        # Rounding in the grid spacing can leave i one step away from the
+        # closest point, so compare with the neighbours directly.
+        if i > 0 and x - c[i - 1] <= c[i] - x:
+            i -= 1
+        elif i < n - 1 and c[i + 1] - x < x - c[i]:
+            i += 1
+        return i
+
+    def indices(self,
+                xs: np.ndarray) -> np.ndarray:
+        """Returns the indices of the grid points closest to each value in xs.
+
+        Args:
+            xs (np.array): x coordinates.
+
+        Returns:
+            np.array: Index of the grid point closest to each value in xs.
+
+        """
+        xs = np.asarray(xs, dtype=np.float32) if self._single else np.asarray(xs)
+        if not self.uniform:
+            return closest_indices(self.coordinates, xs)
+        c = self.coordinates
+        n = self._n
+        i = np.clip(np.ceil((xs - self._x0) / self._dx - 0.5), 0, n - 1).astype(np.intp)
+        lower = np.maximum(i - 1, 0)
+        upper = np.minimum(i + 1, n - 1)
+        i = np.where((i > 0) & (xs - c[lower] <= c[i] - xs), lower,
+                     np.where((i < n - 1) & (c[upper] - xs < xs - c[i]), upper, i))
+        return i
+
 def delta_x_from_grid(coordinates: np.ndarray,
                       limits: Tuple[float, float]) -> np.ndarray:
     """
@@ -111,6 +362,34 @@ def delta_x_from_grid(coordinates: np.ndarray,
     delta_x = np.insert(delta_x, len(delta_x), limits[1])
     return delta_x
 
+def lookup_coordinates(coordinates: np.ndarray,
+                       dtype: type = np.float64) -> np.ndarray:
+    """Returns the grid coordinates as an array of the given dtype, for finding the grid point closest to a given x.
+
+    Finding the closest grid point only needs the order of the coordinates to be preserved,
+    so a single precision (np.float32) copy of the grid can be used to halve the memory read by the search.
+
+    Args:
+        coordinates (np.array): Sorted 1D grid of x coordinates.
+        dtype (optional, type): dtype of the returned coordinates. Default is np.float64.
+
+    Returns:
+        np.array: The coordinates, as an array of dtype.
+
+    Raises:
+        ValueError: If converting the coordinates to dtype changes them by half the smallest grid spacing or more,
+            so that the closest grid point could be different.
+
+    """
+    lookup = np.asarray(coordinates, dtype=dtype)
+    if lookup.dtype != np.asarray(coordinates).dtype and len(lookup) > 1:
+        rounding_error = np.max(np.abs(lookup.astype(np.float64) - coordinates))
+        if np.min(np.diff(coordinates)) <= 2.0 * rounding_error:
+            raise ValueError(f"Grid spacing is too small to represent the grid coordinates as {lookup.dtype}")
+    return lookup
+
+_site_version = attrgetter('_version')
+
 class Grid:
 
     def __init__(self,
@@ -119,7 +398,8 @@ class Grid:
                  c: float,
                  limits: Tuple[float, float],
                  limits_for_laplacian: Tuple[float, float],
-                 set_of_sites: SetOfSites) -> None:
+                 set_of_sites: SetOfSites,
+                 grid_dtype: type = np.float64) -> None:
        # x_coordinates need to be sorted for the delta_x calculation in volumes_from_grid
         """
         Grid objects contain information and methods for the calculation grid.
@@ -136,12 +416,19 @@ class Grid:
             limits ([float,float])    x-coordinates for the minimum and maximum grid edges.
             set_of_sites (SetOfSites): Set of Site objects that populate the Grid.
             defect_Species (list): Defect species that populate the Grid.
+            grid_dtype (optional, type): dtype of `lookup_x`, the copy of the x coordinates used to find the grid point closest to a given x.
+                np.float32 halves the memory used by these lookups for large grids. Charges and potentials are always calculated in double precision.
+                Default is np.float64.
         Returns:
             None
         """
         self.delta_x = delta_x_from_grid(x_coordinates, limits)
         self.volumes = self.delta_x * b * c
         self.x = x_coordinates
+        self.grid_dtype = np.dtype(grid_dtype)
+        self.lookup_x = lookup_coordinates(x_coordinates, grid_dtype)
+        # Finds the grid point closest to a given x, using `lookup_x`.
+        self.lookup_indexer = GridIndexer(self.lookup_x)
         self.points = [GridPoint(x=x, volume=v)
                        for x, v in zip(self.x, self.volumes)]
         self.limits = limits
@@ -149,9 +436,13 @@ class Grid:
         self.b = b
         self.c = c
         self.set_of_sites = set_of_sites
+        self._site_arrays: Optional[Tuple[np.ndarray, ...]] = None
+        # The sites on this grid, and their versions, when `_site_arrays` was last built.
+        self._packed_sites: List[Site] = []
+        self._packed_site_versions: List[int] = []
         self.defect_species: List[DefectSpecies] = []
         for site in set_of_sites:
-            i = index_of_grid_at_x(self.x, site.x)
+            i = index_of_grid_at_x(self.lookup_indexer, site.x)
             self.points[i].sites.append(site)
             site.grid_point = self.points[i]
             for defect_species in site.defect_species:
@@ -175,16 +466,35 @@ class Grid:
         Returns:
             np.array: Overall charge at each point on a 1D grid.
         """
-        charge = np.zeros_like(self.x)
-        for i, point in enumerate(self.points):
-            charge[i] = sum([site.charge(
-                                phi=phi_at_x(
-                                    phi=phi,
-                                    coordinates=self.x,
-                                    x=site.x),
-                                temp=temp)
-                             for site in point.sites])
-        return np.array(charge)
+        sites = [site for point in self.points for site in point.sites]
+        versions = list(map(_site_version, sites))
+        if (self._site_arrays is None or
+                sites != self._packed_sites or versions != self._packed_site_versions):
+            self._update_site_arrays(sites, versions)
+        point_index, phi_index, valences, mole_fractions, energies, mobile_mask, alpha, scaling, site_valences = self._site_arrays # type: ignore
+        site_charges = charges_of_sites(valences, mole_fractions, energies, mobile_mask,
+                                        alpha, scaling, site_valences, phi[phi_index], temp)
+        return np.bincount(point_index, weights=site_charges, minlength=len(self.x))
+
+    def _update_site_arrays(self,
+                            sites: List[Site],
+                            versions: List[int]) -> None:
+        """Collects the defect data for every site on this grid into the arrays used by `Grid.charge()`.
+
+        Args:
+            sites (list(Site)): The sites on this grid, in grid point order.
+            versions (list(int)): The current version of each site.
+
+        Returns:
+            None
+
+        """
+        point_index = np.array([i for i, point in enumerate(self.points) for site in point.sites], dtype=np.intp)
+        # phi at each site is phi at the grid point closest to the site.
+        phi_index = np.asarray(index_of_grid_at_x(self.lookup_indexer, np.array([site.x for site in sites])), dtype=np.intp)
+        self._site_arrays = (point_index, phi_index) + defect_arrays_for_sites(sites)
+        self._packed_sites = sites
+        self._packed_site_versions = versions
 
     def rho(self,
             phi: np.ndarray,
@@ -256,7 +566,8 @@ class Grid:
                                       limits=self.limits,
                                       limits_for_laplacian=self.limits_for_laplacian,
                                       b=self.b,
-                                      c=self.c)
+                                      c=self.c,
+                                      grid_dtype=self.grid_dtype)
 
     @classmethod
     def from_set_of_sites(cls: object,
@@ -264,7 +575,8 @@ class Grid:
                           limits: Tuple[float, float],
                           limits_for_laplacian: Tuple[float, float],
                           b: float,
-                          c: float) -> Grid:
+                          c: float,
+                          grid_dtype: type = np.float64) -> Grid:
         """
         Creates a grid from a given Set_of_Sites object.
 
@@ -274,6 +586,7 @@ class Grid:
             limits_for_laplacian (list): distance between the endmost sites and the next site outside of the calculation region for the first and last sites respectively.
             b (float):                b dimension for every grid-point.
             c (float):                c dimension for every grid-point.
+            grid_dtype (optional, type): dtype of the coordinates used for grid point lookups (see `Grid`). Default is np.float64.
 
         Returns:
             :obj:`Grid`: Grid object for the given set of sites.
@@ -284,4 +597,5 @@ class Grid:
                     c=c,
                     limits=limits,
                     limits_for_laplacian=limits_for_laplacian,
-                    set_of_sites=set_of_sites)
+                    set_of_sites=set_of_sites,
+                    grid_dtype=grid_dtype)
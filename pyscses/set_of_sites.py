@@ -2,7 +2,7 @@ from __future__ import annotations
 from scipy.interpolate import griddata # type: ignore
 import numpy as np
 import math
-from pyscses.set_up_calculation import site_from_input_file, load_site_data
+from pyscses.set_up_calculation import sites_from_input_data, load_site_data
 from pyscses.grid import index_of_grid_at_x, phi_at_x, energy_at_x
 from pyscses.constants import boltzmann_eV
 from pyscses.defect_species import DefectSpecies
@@ -106,7 +106,7 @@ class SetOfSites:
             prob = []
             for site in self.sites:
                 if j == site.x:
-                    prob.append(site.probabilities_as_list(phi_at_x(phi, grid.x, site.x), temp))
+                    prob.append(site._probabilities_array(phi_at_x(phi, grid.lookup_indexer, site.x), temp))
             if len(prob) == 0:
                 probability[i] = 0
             else:
@@ -130,9 +130,11 @@ class SetOfSites:
 
         """
         defect_density = np.zeros_like( grid.x )
-        for site in self.sites:
-            i = index_of_grid_at_x( grid.x, site.x )
-            defect_density[ i ] += np.asarray( site.probabilities_as_list( phi_at_x( phi, grid.x, site.x ), temp ) ) / grid.volumes[ i ]
+        site_x = np.array( [ site.x for site in self.sites ] )
+        site_indices = index_of_grid_at_x( grid.lookup_indexer, site_x )
+        site_phi = phi_at_x( phi, grid.lookup_indexer, site_x )
+        for site, i, p in zip( self.sites, site_indices, site_phi ):
+            defect_density[ i ] += site._probabilities_array( p, temp ) / grid.volumes[ i ]
         return defect_density
 
     def subgrid_calculate_defect_density(self,
@@ -154,9 +156,11 @@ class SetOfSites:
 
         """
         defect_density = np.zeros_like( sub_grid.x )
-        for site in self.sites:
-            i = index_of_grid_at_x( sub_grid.x, site.x )
-            defect_density[ i ] += np.asarray( site.probabilities_as_list( phi_at_x( phi, full_grid.x, site.x ), temp ) ) / sub_grid.volumes[ i ]
+        site_x = np.array( [ site.x for site in self.sites ] )
+        site_indices = index_of_grid_at_x( sub_grid.lookup_indexer, site_x )
+        site_phi = phi_at_x( phi, full_grid.lookup_indexer, site_x )
+        for site, i, p in zip( self.sites, site_indices, site_phi ):
+            defect_density[ i ] += site._probabilities_array( p, temp ) / sub_grid.volumes[ i ]
         return defect_density
 
 
@@ -217,7 +221,8 @@ class SetOfSites:
                                      site_charge: bool,
                                      core: str,
                                      temperature: float,
-                                     offset: float = 0.0) -> SetOfSites:
+                                     offset: float = 0.0,
+                                     lazy: bool = False) -> SetOfSites:
         """
         Takes the data from the input file and creates a SetOfSites object for those sites.
         The input data file is a .txt file where each line in the file corresponds to a site. The values in each line are formatted and separated into the corresponding properties before creating a Site object for each site.
@@ -229,10 +234,16 @@ class SetOfSites:
             site_charge (bool): The site charge refers to the contribution to the overall charge of a site given by the original, non-defective species present at that site. True if the site charge contribution is to be included in the calculation, False if it is not to be included.
             core (str): Core definition. 'single' = Single segregation energy used to define the core. 'multi-site' = Layered segregation energies used to define the core while the energies fall in the region of positive and negative kT. 'all' = All sites between a minimum and maximum x coordinate used in calculation.
     	    temperature (float): Temperature that the calculation is being run at.
+            offset (optional, float): Offset added to non-zero defect segregation energies. Default is 0.0.
+            lazy (optional, bool): If True, the sites are created with `lazy=True`, so their `DefectAtSite` objects
+                are only created when needed (see `Site`). Default is False.
 
     	Returns:
     	    :obj:`SetOfSites`: `SetOfSites` object for the input data.
 
+        Raises:
+            ValueError: If the input file contains defect labels that are not in `defect_species`.
+
      	"""
         site_data = load_site_data(filename, limits[0], limits[1], site_charge, offset)
         energies = [line[4] for line in site_data]
@@ -245,7 +256,7 @@ class SetOfSites:
             for line in site_data:
                 if ( -boltzmann_eV * temperature) <= line[4] <= ( boltzmann_eV * temperature ):
                     line[4] = 0.0
-        return SetOfSites([site_from_input_file(line, defect_species, site_charge, core, temperature) for line in site_data])
+        return SetOfSites(sites_from_input_data(site_data, defect_species, site_charge, lazy=lazy))
 
 # BEN: Is this used?
 #     @ classmethod
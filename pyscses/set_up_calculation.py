@@ -27,14 +27,7 @@ def site_from_input_file(site,
         :obj:`Site`
 
     """
-    label = site[0]
-    if site_charge == True:
-        valence = float(site[1])
-    if site_charge == False:
-        valence = 0.0
-    x = float(site[2])
-    defect_labels = site[3::2]
-    defect_energies = [float(e) for e in site[4::2]]
+    label, valence, x, defect_labels, defect_energies = _parse_site_line(site, site_charge)
     if zero_energies_less_than_kT:
         kT = boltzmann_eV * temperature
         for d_e in defect_energies:
@@ -46,6 +39,64 @@ def site_from_input_file(site,
                 defect_energies,
                 valence=valence)
 
+def _parse_site_line(line,
+                     site_charge):
+    """
+    Splits a line of the input data into the arguments for the corresponding Site.
+
+    Args:
+        line (list): A line in the input file, split into individual values.
+        site_charge (bool): True if the site charge contribution is to be included in the calculation, False if it is not to be included.
+
+    Returns:
+        tuple: label (str), valence (float), x coordinate (float), defect labels (list(str)) and defect energies (list(float)).
+
+    """
+    label = line[0]
+    valence = float(line[1]) if site_charge else 0.0
+    x = float(line[2])
+    defect_labels = line[3::2]
+    defect_energies = [float(e) for e in line[4::2]]
+    return label, valence, x, defect_labels, defect_energies
+
+def sites_from_input_data(input_data,
+                          defect_species,
+                          site_charge,
+                          lazy=False):
+    """
+    Takes the formatted data from the input file and converts each line into a site.
+    Equivalent to calling `site_from_input_file()` for each line, but the defect labels
+    are checked against `defect_species` once for the whole input.
+
+    Args:
+        input_data (list): Formatted lines from the input file, as returned by `load_site_data()`.
+        defect_species (dict): Dictionary of `DefectSpecies` objects, keyed by defect label.
+        site_charge (bool): True if the site charge contribution is to be included in the calculation, False if it is not to be included.
+        lazy (optional(bool)): Passed to `Site`. If True, the `DefectAtSite` objects for each site are only created when needed.
+            Default is False.
+
+    Returns:
+        list(:obj:`Site`)
+
+    Raises:
+        ValueError: If the input data contains defect labels that are not in `defect_species`.
+            (`site_from_input_file()` raises a KeyError for the first unknown label instead.)
+
+    """
+    missing_labels = {l for line in input_data for l in line[3::2]} - set(defect_species)
+    if missing_labels:
+        raise ValueError("Input data contains unknown defect labels: {}".format(sorted(missing_labels)))
+    sites = []
+    for line in input_data:
+        label, valence, x, defect_labels, defect_energies = _parse_site_line(line, site_charge)
+        sites.append(Site(label,
+                          x,
+                          [defect_species[l] for l in defect_labels],
+                          defect_energies,
+                          valence=valence,
+                          lazy=lazy))
+    return sites
+
 def format_line(line,
                 site_charge,
                 offset = 0.0):
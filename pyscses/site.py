@@ -4,10 +4,14 @@ import math
 from pyscses.constants import fundamental_charge, boltzmann_eV
 from pyscses.grid_point import GridPoint
 from pyscses.defect_species import DefectSpecies
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Sequence, Tuple
 from pyscses.defect_at_site import DefectAtSite
+from pyscses._numba import NUMBA_AVAILABLE, njit, guvectorize, aot_kernels
 import warnings
 
+# Set after the first call to `Site.probabilities_as_list()`, so that its deprecation warning is only issued once.
+_probabilities_as_list_warned = False
+
 class LabelError(Exception):
     pass
 
@@ -21,7 +25,7 @@ class Site:
         defect_energies (list): List of segregation energies for all defects present at the site.
         defect_species (list): List of defect species for all defects present at the site.
         defects (list): List of DefectAtSite objects, containing the properties of all individual defects at the site.
-        scaling (float): A scaling factor that can be applied in the charge calculation.
+        scaling (np.array): Scaling factors for each defect that can be applied in the charge calculation.
         valence (float): The charge of the defect present at the site (in atomic units).
         saturation_parameter (float): Optional saturation parameter as described in
             `Hendricks et al. Sol. Stat. Ionics (2002)`_
@@ -40,6 +44,11 @@ class Site:
 
     """
 
+    __slots__ = ('label', '_x', 'defect_energies', 'defect_species', '_defects', '_scaling', 'grid_point',
+                 '_valence', 'saturation_parameter', '_alpha', '_defect_labels',
+                 '_defect_by_label', '_valences', '_mole_fractions', '_energies', '_mobile_mask',
+                 '_fixed_mf_sum', '_bf_cache', '_version', '_valence_fc', '_charge_weights')
+
     def __init__(self,
                  label: str,
                  x: float,
@@ -47,7 +56,8 @@ class Site:
                  defect_energies: List[float],
                  scaling: Optional[np.ndarray] = None,
                  valence: float = 0.0,
-                 saturation_parameter: float = 1.0) -> None:
+                 saturation_parameter: float = 1.0,
+                 lazy: bool = False) -> None:
         """Initialise a Site object.
 
         Args:
@@ -62,6 +72,10 @@ class Site:
                 and Swift et al. Nature Comp. Sci. (2021). [#SwiftEtAl_NatureCompSci2021]_.
                 A saturation parameter < 1.0 introduces some proportion of excluded sites that are
                 unavailable for occupation by any explicit defects. Default is 1.0.
+            lazy (optional, bool): If True, the `DefectAtSite` objects for this site are not created until
+                `self.defects` is first accessed (e.g. by `defect_with_label()`). The charge and probability
+                calculations only use the per-defect arrays, so this saves time and memory when setting up
+                systems with many sites. Default is False.
 
         Raises:
             ValueError if the number of DefectSpecies != the number of defect segregation energies != the number of scaling factors (if passed).
@@ -75,31 +89,180 @@ class Site:
         """
         if len(defect_species) != len(defect_energies):
             raise ValueError("len(defect_species) must be equal to len(defect_energies)")
-        if scaling:
+        if scaling is not None:
             if len(defect_species) != len(scaling):
                 raise ValueError("len(defect_species) must be equal to len(scaling)")
+        # Incremented whenever any of the data used to calculate the charge at this site changes,
+        # so that objects holding copies of this data (see `defect_arrays_for_sites()`) can tell when to rebuild them.
+        self._version = 0
         self.label = label
         self.x = x
         self.defect_energies = defect_energies
         self.defect_species = defect_species
-        self.defects = [DefectAtSite(label=d.label,
-                                     valence=d.valence,
-                                     mole_fraction=d.mole_fraction,
-                                     mobility=d.mobility,
-                                     energy=e,
-                                     site=self,
-                                     fixed=d.fixed)
-            for d, e in zip(defect_species, defect_energies)]
-        if scaling:
-            self.scaling = scaling
+        self._defects: Optional[List[DefectAtSite]] = None
+        if not lazy:
+            self._defects = self._create_defects()
+        # Set directly rather than through the setters, which update the charge weights
+        # built by `update_defect_arrays()` below.
+        if scaling is not None:
+            self._scaling = _read_only_array(scaling)
         else:
-            self.scaling = np.ones_like(defect_energies, dtype=float)
+            self._scaling = _read_only_array(np.ones(len(defect_energies)))
         self.grid_point: Optional[GridPoint] = None
-        self.valence = valence
+        self._valence = valence
         self.saturation_parameter = saturation_parameter
-        self.fixed_defects = tuple(d for d in self.defects if d.fixed)
-        self.mobile_defects = tuple(d for d in self.defects if not d.fixed)
-        self.alpha = self.saturation_parameter - sum((d.mole_fraction for d in self.fixed_defects))
+        self.update_defect_arrays()
+
+    def _create_defects(self) -> List[DefectAtSite]:
+        """Creates the `DefectAtSite` objects for each defect species at this site."""
+        return [DefectAtSite(label=d.label,
+                             valence=d.valence,
+                             mole_fraction=d.mole_fraction,
+                             mobility=d.mobility,
+                             energy=e,
+                             site=self,
+                             fixed=d.fixed)
+            for d, e in zip(self.defect_species, self.defect_energies)]
+
+    @property
+    def x(self) -> float:
+        """x coordinate of this site."""
+        return self._x
+
+    @x.setter
+    def x(self, x: float) -> None:
+        self._x = x
+        self._version += 1
+
+    @property
+    def valence(self) -> float:
+        """Formal valence for this site in the absence of any defects."""
+        return self._valence
+
+    @valence.setter
+    def valence(self, valence: float) -> None:
+        self._valence = valence
+        self._update_charge_weights()
+        self._version += 1
+
+    @property
+    def scaling(self) -> np.ndarray:
+        """Scaling factors for the net charge of each defect species at this site.
+
+        The array is read-only: assign a new array to change the scaling.
+        """
+        return self._scaling
+
+    @scaling.setter
+    def scaling(self, scaling: np.ndarray) -> None:
+        if len(scaling) != len(self.defect_species):
+            raise ValueError("len(defect_species) must be equal to len(scaling)")
+        # Stored as a read-only copy, so that it can only be changed through this setter, which updates `_version`.
+        self._scaling = _read_only_array(scaling)
+        self._update_charge_weights()
+        self._version += 1
+
+    @property
+    def alpha(self) -> float:
+        """Proportion of this site available for occupation by mobile defects."""
+        return self._alpha
+
+    @alpha.setter
+    def alpha(self, alpha: float) -> None:
+        self._alpha = alpha
+        # The cached probability denominator depends on alpha.
+        self._bf_cache = (None, None, None, None)
+        self._version += 1
+
+    @property
+    def defects(self) -> List[DefectAtSite]:
+        """List of `DefectAtSite` objects for all defects at this site.
+
+        For a Site created with `lazy=True` these are created on first access.
+        """
+        if self._defects is None:
+            self._defects = self._create_defects()
+            # The per-defect arrays were already built from the same data, so only the label lookup is needed.
+            # Calling `update_defect_arrays()` here would also reset any `alpha` that has been set.
+            self._defect_by_label = {d.label: d for d in reversed(self._defects)}
+        return self._defects
+
+    @property
+    def fixed_defects(self) -> Tuple[DefectAtSite, ...]:
+        """Tuple of the fixed defects at this site."""
+        return tuple(d for d in self.defects if d.fixed)
+
+    @property
+    def mobile_defects(self) -> Tuple[DefectAtSite, ...]:
+        """Tuple of the mobile defects at this site."""
+        return tuple(d for d in self.defects if not d.fixed)
+
+    def update_defect_arrays(self) -> None:
+        """Updates the per-defect data cached from `self.defects`.
+
+        The valences, mole fractions, segregation energies and mobile / fixed status of the defects at this site
+        are stored as numpy arrays (in the same order as `self.defects`), along with the defect labels, `alpha`
+        and the charge weights used by `charge()`.
+        This is called automatically when any of these properties of a `DefectAtSite` at this site are changed.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        if self._defects is None:
+            # Created with lazy=True: read the defect data directly from the defect species.
+            data = [(d.label, d.valence, d.mole_fraction, e, d.fixed)
+                    for d, e in zip(self.defect_species, self.defect_energies)]
+            self._defect_by_label = None
+        else:
+            data = [(d.label, d.valence, d.mole_fraction, d.energy, d.fixed) for d in self._defects]
+            # Built in reverse so that the first defect with a given label takes precedence.
+            self._defect_by_label = {d.label: d for d in reversed(self._defects)}
+        labels, valences, mole_fractions, energies, fixed = zip(*data) if data else ((), (), (), (), ())
+        self._defect_labels = tuple(labels)
+        self._valences = np.array(valences, dtype=float)
+        self._mole_fractions = np.array(mole_fractions, dtype=float)
+        self._energies = np.array(energies, dtype=float)
+        self._mobile_mask = ~np.array(fixed, dtype=bool)
+        # Total mole fraction of the fixed defects, so that alpha can be updated without rescanning the defects.
+        self._fixed_mf_sum: float = float(self._mole_fractions[~self._mobile_mask].sum())
+        self.alpha = self.saturation_parameter - self._fixed_mf_sum
+        self._update_charge_weights()
+        # (phi, temp, Boltzmann factors, denominator) from the last call to `_probabilities_array()`.
+        self._bf_cache: Tuple = (None, None, None, None)
+        self._version += 1
+
+    def _update_charge_weights(self) -> None:
+        """Updates the defect charges (valence * scaling) and site valence in Coulombs, used by `charge()`.
+
+        Called when the valence, scaling or defect arrays for this site change.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        self._charge_weights = self._valences * self._scaling * fundamental_charge
+        self._valence_fc = self._valence * fundamental_charge
+
+    def reset_saturation_parameter(self,
+                                   saturation_parameter: float) -> None:
+        """Sets a new saturation parameter for this site, and updates `alpha`.
+
+        Args:
+            saturation_parameter (float): The new saturation parameter.
+
+        Returns:
+            None
+
+        """
+        self.saturation_parameter = saturation_parameter
+        self.alpha = saturation_parameter - self._fixed_mf_sum
 
     def competing_defect_species(self) -> Dict[str, int]:
         """Returns a dictionary reporting the number of fixed and / or mobile defect species that can occupy this site.
@@ -124,10 +287,13 @@ class Site:
                 DefectAtSite: The DefectAtSite that matches the label.
 
         """
-        if not label in (d.label for d in self.defects):
-            raise LabelError(f"\"{label}\" does not match any of the defect species labels for this site.")
-        else:
-            return next(d for d in self.defects if d.label == label)
+        if self._defect_by_label is None:
+            # Created with lazy=True: accessing self.defects creates the DefectAtSite objects.
+            self.defects
+        try:
+            return self._defect_by_label[label] # type: ignore
+        except KeyError:
+            raise LabelError(f"\"{label}\" does not match any of the defect species labels for this site.") from None
 
     def energies(self) -> List[float]:
         """Returns a list of the segregation energies for each defect from self.defects """
@@ -165,18 +331,8 @@ class Site:
             dict(str, float): Probabilities of site occupation for each defect species.
 
         """
-        probabilities_dict = {}
-        boltzmann_factors = {d.label: d.boltzmann_factor(phi, temp) for d in self.mobile_defects}
-        denominator = (self.alpha +
-                       sum([d.mole_fraction * (boltzmann_factors[d.label] - 1.0)
-                            for d in self.mobile_defects]))
-        for defect in self.defects:
-            if defect.fixed:
-                probabilities_dict[defect.label] = defect.mole_fraction
-            else:
-                numerator = self.alpha * defect.mole_fraction * boltzmann_factors[defect.label]
-                probabilities_dict[defect.label] = numerator / denominator
-        return probabilities_dict
+        probabilities = self._probabilities_array(phi=phi, temp=temp)
+        return dict(zip(self._defect_labels, probabilities.tolist()))
 
     def probabilities_as_list(self,
                               phi: float,
@@ -185,6 +341,8 @@ class Site:
 
         Legacy interface that returns a list of site-occupation probabilities
         in the same order as `Site.defects`.
+        Deprecated, and will be removed in pyscses 2.0. Use `Site.probabilities()` instead.
+        A DeprecationWarning is issued on the first call only.
 
             Args:
             phi (float): Electrostatic potential at this site in Volts.
@@ -194,13 +352,60 @@ class Site:
             list(float): Probabilities of site occupation for each defect species.
 
         """
-        warnings.warn("Site.probabilities_as_list() is deprecated and targeted for removal. Please use Site.probabilities() instead.", DeprecationWarning)
+        global _probabilities_as_list_warned
+        if not _probabilities_as_list_warned:
+            warnings.warn("Site.probabilities_as_list() is deprecated and will be removed in pyscses 2.0. Please use Site.probabilities() instead.", DeprecationWarning)
+            _probabilities_as_list_warned = True
         probabilities_dict = self.probabilities(phi=phi, temp=temp)
         return [probabilities_dict[d.label] for d in self.defects]
 
+    def _probabilities_array(self,
+                             phi: float,
+                             temp: float) -> np.ndarray:
+        """Calculates the probabilities of this site being occupied by each defect species.
+
+        The Boltzmann factors and denominator from the last call are reused if phi and temp are unchanged,
+        e.g. when `probabilities()` and `charge()` are called for the same phi and temp.
+        This only applies to the NumPy path of `charge()`; with Numba, `charge()` uses the compiled
+        `_site_charge()` kernel instead.
+
+        Args:
+            phi (float): Electrostatic potential at this site in Volts.
+            temp (float): Temperature in Kelvin.
+
+        Returns:
+            np.array: Probabilities of site occupation for each defect species, in the same order as `self.defects`.
+
+        """
+        cached_phi, cached_temp, boltzmann_factors, denominator = self._bf_cache
+        if phi != cached_phi or temp != cached_temp:
+            boltzmann_factors = self._boltzmann_factors_array(phi=phi, temp=temp)
+            denominator = self.alpha + np.sum(self._mole_fractions * (boltzmann_factors - 1.0),
+                                              where=self._mobile_mask)
+            self._bf_cache = (phi, temp, boltzmann_factors, denominator)
+        numerator = self.alpha * self._mole_fractions * boltzmann_factors
+        # Only divide for the mobile defects: without any, the denominator can be zero.
+        return np.divide(numerator, denominator, out=self._mole_fractions.copy(), where=self._mobile_mask)
+
+    def _boltzmann_factors_array(self,
+                                 phi: float,
+                                 temp: float) -> np.ndarray:
+        """Calculates the Boltzmann factor for each defect at this site (see `DefectAtSite.boltzmann_factor()`).
+
+        Args:
+            phi (float): Electrostatic potential at this site in Volts.
+            temp (float): Temperature in Kelvin.
+
+        Returns:
+            np.array: Boltzmann factors for each defect species, in the same order as `self.defects`.
+
+        """
+        return np.exp(-(self._valences * phi + self._energies) / (boltzmann_eV * temp))
+
     def defect_valences(self) -> np.ndarray:
         """Returns an array of valences for each defect in `self.defects`"""
-        return np.array([d.valence for d in self.defects])
+        # A copy, so that changing the returned array does not change the cached valences used by `charge()`.
+        return self._valences.copy()
 
     def charge(self,
                phi: float,
@@ -216,9 +421,133 @@ class Site:
             float: The charge at this site.
 
         """
-        defect_probabilities = self.probabilities(phi=phi, temp=temp)
-        charge = sum([defect_probabilities[d.label] * d.valence
-                      for d in self.defects]) * self.scaling
-        charge += self.valence
-        charge *= fundamental_charge
-        return float(charge)
+        if aot_kernels is not None:
+            return aot_kernels.site_charge(self._valences, self._mole_fractions, self._energies, self._mobile_mask,
+                                           self.alpha, self.scaling, self.valence, phi, temp)
+        if NUMBA_AVAILABLE:
+            return _site_charge(self._valences, self._mole_fractions, self._energies, self._mobile_mask,
+                                self.alpha, self.scaling, self.valence, phi, temp)
+        probabilities = self._probabilities_array(phi=phi, temp=temp)
+        return float(np.dot(probabilities, self._charge_weights) + self._valence_fc)
+
+def _read_only_array(values: Sequence[float]) -> np.ndarray:
+    """Returns a read-only float64 copy of values."""
+    array = np.array(values, dtype=np.float64)
+    array.flags.writeable = False
+    return array
+
+def defect_arrays_for_sites(sites: Sequence[Site]) -> Tuple[np.ndarray, ...]:
+    """Collects the per-defect data for a sequence of sites into 2D arrays, for use with `charges_of_sites()`.
+
+    Each row corresponds to one site. Sites with fewer defects than the maximum are padded with
+    fixed defects with zero valence and zero mole fraction, which do not contribute to the site charge.
+
+    Args:
+        sites (list(Site)): The sites.
+
+    Returns:
+        tuple(np.array): valences, mole_fractions, energies, mobile_mask, alpha, scaling, site_valences,
+            in the order of the arguments to `charges_of_sites()`.
+            alpha and site_valences have shape (n_sites,); the other arrays have shape (n_sites, n_defects).
+
+    """
+    n_sites = len(sites)
+    n_defects = max((len(site._valences) for site in sites), default=1)
+    valences = np.zeros((n_sites, n_defects))
+    mole_fractions = np.zeros((n_sites, n_defects))
+    energies = np.zeros((n_sites, n_defects))
+    mobile_mask = np.zeros((n_sites, n_defects), dtype=bool)
+    scaling = np.zeros((n_sites, n_defects))
+    alpha = np.empty(n_sites)
+    site_valences = np.empty(n_sites)
+    for i, site in enumerate(sites):
+        n = len(site._valences)
+        valences[i, :n] = site._valences
+        mole_fractions[i, :n] = site._mole_fractions
+        energies[i, :n] = site._energies
+        mobile_mask[i, :n] = site._mobile_mask
+        scaling[i, :n] = site.scaling
+        alpha[i] = site.alpha
+        site_valences[i] = site.valence
+    return valences, mole_fractions, energies, mobile_mask, alpha, scaling, site_valences
+
+@njit(fastmath=True, cache=True)
+def _site_charge(valences, mole_fractions, energies, mobile_mask, alpha, scaling, site_valence, phi, temp):
+    """Charge at a single site (in Coulombs), as `Site.charge()`, calculated in a single loop over the defects."""
+    kT = boltzmann_eV * temp
+    denominator = alpha
+    mobile_charge = 0.0
+    fixed_charge = 0.0
+    has_mobile = False
+    for i in range(valences.shape[0]):
+        if mobile_mask[i]:
+            has_mobile = True
+            boltzmann_factor = math.exp(-(valences[i] * phi + energies[i]) / kT)
+            denominator += mole_fractions[i] * (boltzmann_factor - 1.0)
+            mobile_charge += mole_fractions[i] * boltzmann_factor * valences[i] * scaling[i]
+        else:
+            fixed_charge += mole_fractions[i] * valences[i] * scaling[i]
+    charge = fixed_charge + site_valence
+    # Without any mobile defects the denominator can be zero (alpha = 0 if the fixed defects saturate the site).
+    if has_mobile:
+        charge += alpha * mobile_charge / denominator
+    return charge * fundamental_charge
+
+def _charge_of_site_kernel(valences, mole_fractions, energies, mobile_mask, alpha, scaling, site_valence, phi, temp, charge):
+    """`_site_charge()` with the result written to charge[0]. Compiled as a gufunc for `charges_of_sites()`."""
+    charge[0] = _site_charge(valences, mole_fractions, energies, mobile_mask, alpha, scaling, site_valence, phi, temp)
+
+# Built by `charges_of_sites()` on first use, so that importing this module does not compile it.
+_charges_of_sites_gufunc = None
+
+def charges_of_sites(valences: np.ndarray,
+                     mole_fractions: np.ndarray,
+                     energies: np.ndarray,
+                     mobile_mask: np.ndarray,
+                     alpha: np.ndarray,
+                     scaling: np.ndarray,
+                     site_valence: np.ndarray,
+                     phi: np.ndarray,
+                     temp: float) -> np.ndarray:
+    """Calculates the charge (in Coulombs) at each of a set of sites, as `Site.charge()`.
+
+    The charges for all the sites are calculated in a single call, using a parallel JIT-compiled kernel
+    if Numba is available, the (serial) ahead-of-time compiled kernel if it has been built but Numba is not installed,
+    or numpy array operations otherwise.
+    The per-defect arrays can be built with `defect_arrays_for_sites()`.
+
+    Args:
+        valences (np.array): Defect valences, shape (n_sites, n_defects).
+        mole_fractions (np.array): Defect mole fractions, shape (n_sites, n_defects).
+        energies (np.array): Defect segregation energies, shape (n_sites, n_defects).
+        mobile_mask (np.array): True for mobile defects, False for fixed defects, shape (n_sites, n_defects).
+        alpha (np.array): `Site.alpha` for each site, shape (n_sites,).
+        scaling (np.array): Charge scaling factors, shape (n_sites, n_defects).
+        site_valence (np.array): `Site.valence` for each site, shape (n_sites,).
+        phi (np.array): Electrostatic potential at each site in Volts, shape (n_sites,).
+        temp (float): Temperature in Kelvin.
+
+    Returns:
+        np.array: The charge at each site.
+
+    """
+    if NUMBA_AVAILABLE:
+        global _charges_of_sites_gufunc
+        if _charges_of_sites_gufunc is None:
+            _charges_of_sites_gufunc = guvectorize(['void(float64[:], float64[:], float64[:], boolean[:], float64, float64[:], float64, float64, float64, float64[:])'],
+                                                   '(n),(n),(n),(n),(),(n),(),(),()->()',
+                                                   target='parallel', nopython=True, cache=True)(_charge_of_site_kernel)
+        return _charges_of_sites_gufunc(valences, mole_fractions, energies, mobile_mask,
+                                        alpha, scaling, site_valence, phi, temp)
+    if aot_kernels is not None:
+        return aot_kernels.site_charges(valences, mole_fractions, energies, mobile_mask,
+                                        alpha, scaling, site_valence, phi, temp)
+    phi = np.asarray(phi)[:, np.newaxis]
+    boltzmann_factors = np.exp(-(valences * phi + energies) / (boltzmann_eV * temp))
+    denominator = alpha + np.sum(mole_fractions * (boltzmann_factors - 1.0), axis=1, where=mobile_mask)
+    mobile_charge = np.sum(mole_fractions * boltzmann_factors * valences * scaling, axis=1, where=mobile_mask)
+    fixed_charge = np.sum(mole_fractions * valences * scaling, axis=1, where=~mobile_mask)
+    # As in `_site_charge()`, sites without mobile defects have no mobile charge term.
+    mobile_charge = np.divide(alpha * mobile_charge, denominator, out=np.zeros_like(denominator),
+                              where=mobile_mask.any(axis=1))
+    return (mobile_charge + fixed_charge + site_valence) * fundamental_charge
@@ -23,7 +23,18 @@ config = {
     'download_url': 'https://github.com/bjmorgan/pyscses/archive/%s.tar.gz' % (VERSION),
     'version': VERSION,
     'install_requires': open( 'requirements.txt' ).read(),
+    # Optional: compiles the charge and grid lookup kernels (see pyscses/_numba.py).
+    'extras_require': { 'numba': [ 'numba' ] },
     'license': 'MIT'
 }
 
+# Build the ahead-of-time compiled kernels if Numba is available.
+# The extension is optional: if it is not built (no Numba, or the build fails, e.g. without a C compiler)
+# pyscses uses the JIT-compiled (or pure Python) versions at runtime.
+try:
+    from pyscses._kernels_aot import cc
+    config['ext_modules'] = [cc.distutils_extension(optional=True)]
+except (ImportError, RuntimeError): # RuntimeError: numba.pycc could not find a C compiler.
+    pass
+
 setup(**config)
@@ -41,6 +41,17 @@ class TestDefectAtSite(unittest.TestCase):
                                    site=Mock(spec=Site),
                                    mobility=1)
 
+    def test_setting_attributes_updates_site_arrays(self):
+        for attribute, value in [('label', 'B'),
+                                 ('valence', 2.0),
+                                 ('mole_fraction', 0.3),
+                                 ('energy', -0.2),
+                                 ('fixed', True)]:
+            self.defect.site.update_defect_arrays.reset_mock()
+            setattr(self.defect, attribute, value)
+            self.assertEqual(getattr(self.defect, attribute), value)
+            self.defect.site.update_defect_arrays.assert_called_once_with()
+
     def test_potential_energy(self):
         phi = 0.5
         self.assertEqual(self.defect.potential_energy(phi), 2.0)
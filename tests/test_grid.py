@@ -1,11 +1,17 @@
 import unittest
 from pyscses.grid import Grid, delta_x_from_grid
 from pyscses.grid import (closest_index,
+    closest_indices,
+    _closest_index_nb,
+    _hunt_closest_index_nb,
     index_of_grid_at_x,
+    GridIndexer,
+    lookup_coordinates,
     energy_at_x,
     phi_at_x,
     delta_x_from_grid)
 from pyscses.grid_point import GridPoint
+from pyscses._numba import aot_kernels
 from pyscses.set_of_sites import SetOfSites
 from pyscses.site import Site
 from pyscses.defect_species import DefectSpecies
@@ -22,8 +28,66 @@ class TestGridFunctions(unittest.TestCase):
         self.assertEqual(closest_index(a, 0.1), 0)
         self.assertEqual(closest_index(a, 9.5), 4)
 
+    def test_closest_index_with_ties_and_repeats(self):
+        a = [0.0, 1.0, 1.0, 2.0, 4.0, 4.0, 4.0, 8.0]
+        for x, expected in [(-1.0, 0), (0.5, 0), (1.0, 1), (1.5, 2),
+                            (3.0, 3), (4.0, 4), (6.0, 6), (9.0, 7)]:
+            self.assertEqual(closest_index(a, x), expected)
+        self.assertEqual(closest_index([2.0], 5.0), 0)
+
+    def test_closest_indices(self):
+        a = np.array([1.0, 3.0, 5.0, 7.0, 9.0])
+        xs = np.array([3.1, 4.1, 4.0, 0.1, 9.5])
+        np.testing.assert_array_equal(closest_indices(a, xs),
+                                      np.array([1, 2, 1, 0, 4]))
+
+    def test_closest_indices_matches_closest_index(self):
+        a = np.array([-2.0, -1.5, 0.0, 0.1, 2.0, 7.0])
+        xs = np.linspace(-3.0, 8.0, 101)
+        expected = np.array([closest_index(a, x) for x in xs])
+        np.testing.assert_array_equal(closest_indices(a, xs), expected)
+
+    def test_closest_index_nb(self):
+        a = np.array([1.0, 3.0, 5.0, 7.0, 9.0])
+        self.assertEqual(_closest_index_nb(a, 3.1), 1)
+        self.assertEqual(_closest_index_nb(a, 4.1), 2)
+        self.assertEqual(_closest_index_nb(a, 4.0), 1)
+        self.assertEqual(_closest_index_nb(a, 0.1), 0)
+        self.assertEqual(_closest_index_nb(a, 9.5), 4)
+
+    def test_closest_index_nb_matches_closest_index(self):
+        for n in range(1, 8):
+            a = np.cumsum(np.arange(1.0, n + 1.0))
+            for x in np.linspace(-1.0, a[-1] + 1.0, 53):
+                self.assertEqual(_closest_index_nb(a, x), closest_index(a, x))
+
+    def test_hunt_closest_index_nb_matches_closest_index(self):
+        a = np.array([-3.0, -2.5, -1.0, 0.0, 0.2, 0.3, 1.0, 4.0, 4.5, 9.0])
+        for guess in range(-1, len(a) + 1):
+            for x in np.linspace(-4.0, 10.0, 57):
+                self.assertEqual(_hunt_closest_index_nb(a, x, guess), closest_index(a, x))
+
+    @unittest.skipIf(aot_kernels is None, 'ahead-of-time compiled kernels not built')
+    def test_aot_kernels_match_closest_index(self):
+        a = np.array([-3.0, -2.5, -1.0, 0.0, 0.2, 0.3, 1.0, 4.0, 4.5, 9.0])
+        for x in np.linspace(-4.0, 10.0, 57):
+            self.assertEqual(aot_kernels.closest_index_f8(a, x), closest_index(a, x))
+            self.assertEqual(aot_kernels.hunt_closest_index_f8(a, x, 3), closest_index(a, x))
+
     def test_index_of_grid_at_x(self):
         coordinates = np.array([-2.0, -1.0, 0.0, 1.0, 2.0])
+        with patch('pyscses.grid._closest_index_nb') as mock_closest_index, \
+             patch('pyscses.grid.aot_kernels', None):
+            mock_closest_index.side_effect = [0, 2, 3]
+            self.assertEqual(index_of_grid_at_x(coordinates=coordinates,
+                                                x=-1.5), 0)
+            self.assertEqual(index_of_grid_at_x(coordinates=coordinates,
+                                                x=0.1), 2)
+            self.assertEqual(index_of_grid_at_x(coordinates=coordinates,
+                                                x=1.5), 3)
+
+    def test_index_of_grid_at_x_with_list(self):
+        coordinates = [-2.0, -1.0, 0.0, 1.0, 2.0]
         with patch('pyscses.grid.closest_index') as mock_closest_index:
             mock_closest_index.side_effect = [0, 2, 3]
             self.assertEqual(index_of_grid_at_x(coordinates=coordinates,
@@ -34,6 +98,35 @@ class TestGridFunctions(unittest.TestCase):
                                                 x=1.5), 3)
 
 
+    def test_index_of_grid_at_x_with_grid_indexer(self):
+        indexer = Mock(spec=GridIndexer)
+        indexer.side_effect = [0, 2]
+        indexer.indices.return_value = np.array([0, 2, 3])
+        self.assertEqual(index_of_grid_at_x(coordinates=indexer, x=-1.5), 0)
+        self.assertEqual(index_of_grid_at_x(coordinates=indexer, x=0.1), 2)
+        x = np.array([-1.5, 0.1, 1.5])
+        np.testing.assert_array_equal(index_of_grid_at_x(coordinates=indexer,
+                                                         x=x), np.array([0, 2, 3]))
+        indexer.indices.assert_called_once_with(x)
+
+    def test_index_of_grid_at_x_with_array(self):
+        coordinates = np.array([-2.0, -1.0, 0.0, 1.0, 2.0])
+        x = np.array([-1.5, 0.1, 1.5])
+        np.testing.assert_array_equal(index_of_grid_at_x(coordinates=coordinates,
+                                                         x=x), np.array([0, 2, 3]))
+
+    def test_index_of_grid_at_x_follows_changes_to_coordinates(self):
+        coordinates = np.array([-2.0, -1.0, 0.0, 1.0, 2.0])
+        x = np.array([-1.5, 0.6, 2.5])
+        np.testing.assert_array_equal(index_of_grid_at_x(coordinates, x), np.array([0, 3, 4]))
+        self.assertEqual(index_of_grid_at_x(coordinates, 0.6), 3)
+        np.copyto(coordinates, np.array([-2.0, -1.5, 0.0, 0.5, 3.0]))
+        np.testing.assert_array_equal(index_of_grid_at_x(coordinates, x), np.array([1, 3, 4]))
+        self.assertEqual(index_of_grid_at_x(coordinates, 0.6), 3)
+        np.copyto(coordinates, np.array([0.0, 1.0, 2.0, 3.0, 4.0]))
+        np.testing.assert_array_equal(index_of_grid_at_x(coordinates, x), np.array([0, 1, 2]))
+        self.assertEqual(index_of_grid_at_x(coordinates, 0.6), 1)
+
     def test_energy_at_x(self):
         energy = np.array([0.1, 0.2, 0.3, 0.4, 0.5])
         coordinates = np.array([-2.0, -1.0, 0.0, 1.0, 2.0])
@@ -64,6 +157,14 @@ class TestGridFunctions(unittest.TestCase):
                                       coordinates=coordinates,
                                       x=0.6), 0.4)
 
+    def test_phi_at_x_with_array(self):
+        phi = np.array([0.1, 0.2, 0.3, 0.4, 0.5])
+        coordinates = np.array([-2.0, -1.0, 0.0, 1.0, 2.0])
+        x = np.array([-1.5, -0.1, 0.6])
+        np.testing.assert_array_equal(phi_at_x(phi=phi,
+                                               coordinates=coordinates,
+                                               x=x), np.array([0.1, 0.3, 0.4]))
+
     def test_delta_x_from_grid(self):
         coordinates = np.array([0.0, 1.0, 3.0, 6.0, 10.0])
         limits = (1.0, 4.0)
@@ -72,6 +173,60 @@ class TestGridFunctions(unittest.TestCase):
             limits=limits), expected_delta_x)
 
 
+class TestGridIndexer(unittest.TestCase):
+
+    def test_grid_indexer_detects_uniform_grid(self):
+        self.assertTrue(GridIndexer(np.linspace(-1.0, 1.0, 11)).uniform)
+        self.assertFalse(GridIndexer(np.array([0.0, 1.0, 3.0, 4.0])).uniform)
+        self.assertFalse(GridIndexer(np.array([0.0])).uniform)
+
+    def test_grid_indexer_matches_closest_index(self):
+        xs = np.linspace(-1.5e-9, 1.5e-9, 401)
+        for coordinates in [np.linspace(-1e-9, 1e-9, 21),
+                            np.array([-2.0, -1.0, 0.0, 1.0, 2.0]) * 1e-9,
+                            np.array([-1.0, -0.7, 0.0, 0.1, 0.9]) * 1e-9]:
+            indexer = GridIndexer(coordinates)
+            expected = np.array([closest_index(coordinates, x) for x in xs])
+            np.testing.assert_array_equal([indexer(x) for x in xs], expected)
+            np.testing.assert_array_equal(indexer.indices(xs), expected)
+
+    def test_grid_indexer_starts_from_previous_result(self):
+        coordinates = np.array([0.0, 1.0, 3.0, 4.0, 7.0, 8.0])
+        with patch('pyscses.grid.aot_kernels', None):
+            indexer = GridIndexer(coordinates)
+        self.assertEqual(indexer(6.9), 4)
+        with patch('pyscses.grid._hunt_closest_index_nb') as mock_hunt:
+            mock_hunt.return_value = 5
+            self.assertEqual(indexer(7.9), 5)
+            mock_hunt.assert_called_once_with(coordinates, 7.9, 4)
+
+    def test_grid_indexer_breaks_ties_towards_smaller_index(self):
+        indexer = GridIndexer(np.array([-2.0, -1.0, 0.0, 1.0, 2.0]))
+        self.assertEqual(indexer(-1.5), 0)
+        self.assertEqual(indexer(1.5), 3)
+        np.testing.assert_array_equal(indexer.indices(np.array([-1.5, 1.5])), [0, 3])
+
+class TestLookupCoordinates(unittest.TestCase):
+
+    def test_lookup_coordinates_returns_double_precision_coordinates_unchanged(self):
+        coordinates = np.array([-1.0, 0.0, 2.0]) * 1e-9
+        self.assertIs(lookup_coordinates(coordinates), coordinates)
+
+    def test_lookup_coordinates_in_single_precision(self):
+        coordinates = np.cumsum(np.random.default_rng(0).uniform(1e-11, 1e-10, 1000)) - 2.5e-8
+        lookup = lookup_coordinates(coordinates, np.float32)
+        self.assertEqual(lookup.dtype, np.float32)
+        xs = np.linspace(coordinates[0] - 1e-10, coordinates[-1] + 1e-10, 3001)
+        indexer = GridIndexer(lookup)
+        np.testing.assert_array_equal(indexer.indices(xs), closest_indices(coordinates, xs))
+        np.testing.assert_array_equal(indexer.indices(coordinates), np.arange(len(coordinates)))
+        np.testing.assert_array_equal([indexer(x) for x in coordinates], np.arange(len(coordinates)))
+
+    def test_lookup_coordinates_raises_ValueError_if_spacing_is_too_small(self):
+        coordinates = np.array([1.0, 1.0 + 1e-9, 2.0])
+        with self.assertRaises(ValueError):
+            lookup_coordinates(coordinates, np.float32)
+
 class TestGrid(unittest.TestCase):
     @patch('pyscses.grid.index_of_grid_at_x')
     @patch('pyscses.grid.GridPoint')
@@ -109,6 +264,91 @@ class TestGrid(unittest.TestCase):
         # TODO Should really check calls to mocked methods are what we expect
         # TODO The large number of assertions in this test suggests that the Grid __init__ method could be simplified / refactored.
 
+    def test_charge( self ):
+        a = DefectSpecies( label='A', valence=2.0, mole_fraction=0.1 )
+        b = DefectSpecies( label='B', valence=-1.0, mole_fraction=0.2 )
+        sites = [ Site( 'X', 0.0, [ a ], [ -0.1 ] ),
+                  Site( 'Y', 0.0, [ b ], [ 0.2 ] ),
+                  Site( 'X', 2.0, [ a, b ], [ 0.1, -0.3 ] ) ]
+        grid = Grid( x_coordinates=np.array( [ 0.0, 1.0, 2.0 ] ), b=1.0, c=1.0, limits=[ 1.0, 1.0 ],
+                     limits_for_laplacian=[ 1.0, 1.0 ], set_of_sites=SetOfSites( sites ) )
+        phi = np.array( [ 0.1, 0.0, -0.2 ] )
+        expected_charge = np.array( [ sites[0].charge( 0.1, 298.0 ) + sites[1].charge( 0.1, 298.0 ),
+                                      0.0,
+                                      sites[2].charge( -0.2, 298.0 ) ] )
+        np.testing.assert_allclose( grid.charge( phi, 298.0 ), expected_charge, rtol=1e-12 )
+        sites[2].defect_with_label( 'B' ).mole_fraction = 0.3
+        expected_charge[2] = sites[2].charge( -0.2, 298.0 )
+        np.testing.assert_allclose( grid.charge( phi, 298.0 ), expected_charge, rtol=1e-12 )
+
+    def test_charge_follows_changes_to_sites( self ):
+        a = DefectSpecies( label='A', valence=2.0, mole_fraction=0.1 )
+        sites = [ Site( 'X', 0.0, [ a ], [ -0.1 ] ),
+                  Site( 'X', 1.0, [ a ], [ 0.2 ] ) ]
+        grid = Grid( x_coordinates=np.array( [ 0.0, 1.0 ] ), b=1.0, c=1.0, limits=[ 1.0, 1.0 ],
+                     limits_for_laplacian=[ 1.0, 1.0 ], set_of_sites=SetOfSites( sites ) )
+        phi = np.array( [ 0.1, -0.1 ] )
+        def expected_charge():
+            return np.array( [ sum( site.charge( phi[ i ], 298.0 ) for site in point.sites )
+                               for i, point in enumerate( grid.points ) ] )
+        grid.charge( phi, 298.0 )
+        sites[1].valence = 3.0
+        np.testing.assert_allclose( grid.charge( phi, 298.0 ), expected_charge(), rtol=1e-12 )
+        scaling = np.array( [ 0.5 ] )
+        sites[0].scaling = scaling
+        np.testing.assert_allclose( grid.charge( phi, 298.0 ), expected_charge(), rtol=1e-12 )
+        # The scaling can only be changed through the setter.
+        scaling[0] = 0.25
+        with self.assertRaises( ValueError ):
+            sites[0].scaling[0] = 0.25
+        self.assertEqual( sites[0].scaling[0], 0.5 )
+        np.testing.assert_allclose( grid.charge( phi, 298.0 ), expected_charge(), rtol=1e-12 )
+        sites[0].alpha = 0.8
+        np.testing.assert_allclose( grid.charge( phi, 298.0 ), expected_charge(), rtol=1e-12 )
+        grid.points[0].sites.append( Site( 'X', 0.0, [ a ], [ 0.3 ] ) )
+        np.testing.assert_allclose( grid.charge( phi, 298.0 ), expected_charge(), rtol=1e-12 )
+        sites[1].x = 0.1
+        np.testing.assert_allclose( grid.charge( phi, 298.0 )[ 1 ], sites[1].charge( phi[ 0 ], 298.0 ), rtol=1e-12 )
+
+    def test_charge_does_not_create_defects_on_lazy_sites( self ):
+        a = DefectSpecies( label='A', valence=2.0, mole_fraction=0.1 )
+        b = DefectSpecies( label='B', valence=-1.0, mole_fraction=0.2 )
+        sites = [ Site( 'X', 0.0, [ a, b ], [ -0.1, 0.3 ], lazy=True ),
+                  Site( 'X', 1.0, [ a ], [ 0.2 ], lazy=True ) ]
+        grid = Grid( x_coordinates=np.array( [ 0.0, 1.0 ] ), b=1.0, c=1.0, limits=[ 1.0, 1.0 ],
+                     limits_for_laplacian=[ 1.0, 1.0 ], set_of_sites=SetOfSites( sites ) )
+        phi = np.array( [ 0.1, -0.1 ] )
+        charge = grid.charge( phi, 298.0 )
+        for site in sites:
+            self.assertIsNone( site._defects )
+        np.testing.assert_allclose( charge, [ sites[0].charge( 0.1, 298.0 ), sites[1].charge( -0.1, 298.0 ) ], rtol=1e-12 )
+
+    def test_charge_does_not_repack_for_unrelated_sites( self ):
+        a = DefectSpecies( label='A', valence=2.0, mole_fraction=0.1 )
+        grid = Grid( x_coordinates=np.array( [ 0.0, 1.0 ] ), b=1.0, c=1.0, limits=[ 1.0, 1.0 ],
+                     limits_for_laplacian=[ 1.0, 1.0 ],
+                     set_of_sites=SetOfSites( [ Site( 'X', 0.0, [ a ], [ -0.1 ] ) ] ) )
+        phi = np.array( [ 0.1, -0.1 ] )
+        grid.charge( phi, 298.0 )
+        Site( 'X', 0.5, [ a ], [ 0.0 ] ).defect_with_label( 'A' ).mole_fraction = 0.2
+        with patch.object( Grid, '_update_site_arrays' ) as mock_update_site_arrays:
+            grid.charge( phi, 298.0 )
+            mock_update_site_arrays.assert_not_called()
+
+    def test_grid_with_single_precision_lookups( self ):
+        a = DefectSpecies( label='A', valence=2.0, mole_fraction=0.1 )
+        sites = [ Site( 'X', x, [ a ], [ -0.1 ] ) for x in [ -1.2e-9, -0.3e-9, 0.0, 0.31e-9, 2.5e-9 ] ]
+        grid = Grid.from_set_of_sites( SetOfSites( sites ), limits=[ 1e-10, 1e-10 ], limits_for_laplacian=[ 1e-10, 1e-10 ],
+                                       b=1.0, c=1.0, grid_dtype=np.float32 )
+        self.assertEqual( grid.x.dtype, np.float64 )
+        self.assertEqual( grid.lookup_x.dtype, np.float32 )
+        self.assertIs( grid.lookup_indexer.coordinates, grid.lookup_x )
+        for point, site in zip( grid.points, sites ):
+            self.assertEqual( point.sites, [ site ] )
+        phi = np.linspace( -0.1, 0.1, 5 )
+        self.assertEqual( grid.charge( phi, 298.0 ).dtype, np.float64 )
+        self.assertEqual( grid.subgrid( 'X' ).grid_dtype, np.float32 )
+
     def test_delta_x_from_grid( self ):
         grid = np.array( [ 0.0, 1.0, 2.0, 3.0, 4.0 ] )
         limits = [1.0, 1.0]
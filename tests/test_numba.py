@@ -0,0 +1,24 @@
+import unittest
+from unittest.mock import patch
+from pyscses import _numba
+
+class TestLoadAotKernels(unittest.TestCase):
+
+    def setUp(self):
+        try:
+            from pyscses import pyscses_kernels
+        except ImportError:
+            self.skipTest('The ahead-of-time compiled kernels have not been built.')
+        self.built_source_hash = pyscses_kernels.source_hash()
+
+    def test_aot_kernels_are_loaded_if_up_to_date(self):
+        with patch('pyscses._numba.kernel_source_hash', return_value=self.built_source_hash):
+            self.assertIsNotNone(_numba._load_aot_kernels())
+
+    def test_out_of_date_aot_kernels_are_not_loaded(self):
+        with patch('pyscses._numba.kernel_source_hash', return_value=-1):
+            with self.assertWarns(RuntimeWarning):
+                self.assertIsNone(_numba._load_aot_kernels())
+
+if __name__ == '__main__':
+    unittest.main()
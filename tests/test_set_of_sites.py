@@ -1,6 +1,7 @@
 import unittest
 from pyscses.set_of_sites import SetOfSites
 from pyscses.site import Site
+from pyscses.defect_species import DefectSpecies
 from unittest.mock import patch, Mock
 
 class TestSetOfSites( unittest.TestCase ):
@@ -29,5 +30,17 @@ class TestSetOfSites( unittest.TestCase ):
         set_of_sites = SetOfSites(sites)
         self.assertEqual(set_of_sites.sites, tuple(sites))
 
+    def test_set_of_sites_from_input_data_with_lazy_sites(self):
+        defect_species = {'A': DefectSpecies(label='A', valence=2.0, mole_fraction=0.1)}
+        site_data = [['O', -2.0, -1.0e-9, 'A', -0.2],
+                     ['O', -2.0, 1.0e-9, 'A', 0.1]]
+        with patch('pyscses.set_of_sites.load_site_data', return_value=site_data) as mock_load_site_data:
+            set_of_sites = SetOfSites.set_of_sites_from_input_data('input.txt', [-2e-9, 2e-9], defect_species,
+                                                                   True, 'none', 298.0, lazy=True)
+            mock_load_site_data.assert_called_once_with('input.txt', -2e-9, 2e-9, True, 0.0)
+        self.assertEqual([site.x for site in set_of_sites.sites], [-1.0e-9, 1.0e-9])
+        for site in set_of_sites.sites:
+            self.assertIsNone(site._defects)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+from pyscses.set_up_calculation import site_from_input_file, sites_from_input_data
+from pyscses.defect_species import DefectSpecies
+import numpy as np
+
+class TestSitesFromInputData(unittest.TestCase):
+
+    def setUp(self):
+        self.defect_species = {'A': DefectSpecies(label='A', valence=2.0, mole_fraction=0.1),
+                               'B': DefectSpecies(label='B', valence=-1.0, mole_fraction=0.2)}
+        self.input_data = [['O', -2.0, -1.5e-9, 'A', -0.2, 'B', 0.1],
+                           ['Ce', 4.0, 0.5e-9, 'B', 0.3]]
+
+    def test_sites_from_input_data_matches_site_from_input_file(self):
+        for site_charge in [True, False]:
+            sites = sites_from_input_data(self.input_data, self.defect_species, site_charge)
+            expected = [site_from_input_file(line, self.defect_species, site_charge, 298.0) for line in self.input_data]
+            self.assertEqual(len(sites), len(expected))
+            for site, expected_site in zip(sites, expected):
+                self.assertEqual(site.label, expected_site.label)
+                self.assertEqual(site.x, expected_site.x)
+                self.assertEqual(site.valence, expected_site.valence)
+                self.assertEqual(site.defect_species, expected_site.defect_species)
+                self.assertEqual(site.defect_energies, expected_site.defect_energies)
+                np.testing.assert_equal(site._valences, expected_site._valences)
+
+    def test_sites_from_input_data_with_lazy_sites(self):
+        sites = sites_from_input_data(self.input_data, self.defect_species, True, lazy=True)
+        self.assertIsNone(sites[0]._defects)
+        self.assertEqual(sites[0].defect_with_label('B').energy, 0.1)
+
+    def test_sites_from_input_data_raises_ValueError_for_unknown_labels(self):
+        self.input_data[1][3] = 'C'
+        with self.assertRaises(ValueError):
+            sites_from_input_data(self.input_data, self.defect_species, True)
+
+if __name__ == '__main__':
+    unittest.main()
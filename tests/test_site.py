@@ -2,10 +2,12 @@ import unittest
 from pyscses.set_of_sites import SetOfSites
 from pyscses.defect_species import DefectSpecies
 from pyscses.defect_at_site import DefectAtSite
-from pyscses.site import Site, LabelError
+from pyscses.site import Site, LabelError, defect_arrays_for_sites, charges_of_sites
 from unittest.mock import Mock, patch
 from pyscses.constants import fundamental_charge
+from pyscses._numba import aot_kernels, NUMBA_AVAILABLE
 import numpy as np
+import warnings
 
 def create_mock_defect_species(n):
     labels = ['a', 'b', 'c', 'd', 'e']
@@ -83,6 +85,18 @@ class TestSiteInit(unittest.TestCase):
         self.assertEqual(site.saturation_parameter, 0.1)
         self.assertEqual(site.alpha, 0.1)
 
+    def test_site_is_initialised_with_scaling_array(self):
+        mock_defect_species = create_mock_defect_species(2)
+        with patch('pyscses.site.DefectAtSite', autospec=True) as mock_DefectAtSite:
+            mock_DefectAtSite.side_effect = create_mock_defects_at_site(2)
+            site = Site(label='B',
+                        x=1.5,
+                        defect_species=mock_defect_species,
+                        defect_energies=[-0.2, +0.2],
+                        scaling=np.array([0.5, 0.4], dtype=np.float32))
+        self.assertEqual(site.scaling.dtype, np.float64)
+        np.testing.assert_equal(site.scaling, np.array([0.5, 0.4], dtype=np.float32))
+
     def test_site_init_with_mixed_mobile_and_fixed_defects(self):
         mock_defect_species = create_mock_defect_species(3)
         mock_defects_at_site = create_mock_defects_at_site(3)
@@ -123,6 +137,229 @@ class TestSiteInit(unittest.TestCase):
                             defect_energies=[-0.2, +0.2],
                             scaling=[0.5])
 
+class TestSiteDefectArrays(unittest.TestCase):
+
+    def setUp(self):
+        defect_species = [DefectSpecies(label='A', valence=2.0, mole_fraction=0.1),
+                          DefectSpecies(label='B', valence=-1.0, mole_fraction=0.2)]
+        self.site = Site(label='X',
+                         x=1.5,
+                         defect_species=defect_species,
+                         defect_energies=[-0.2, +0.3])
+
+    def test_defect_arrays_are_initialised(self):
+        np.testing.assert_equal(self.site._valences, np.array([2.0, -1.0]))
+        np.testing.assert_equal(self.site._mole_fractions, np.array([0.1, 0.2]))
+        np.testing.assert_equal(self.site._energies, np.array([-0.2, 0.3]))
+        np.testing.assert_equal(self.site._mobile_mask, np.array([True, True]))
+
+    def test_defect_arrays_are_updated_when_a_defect_changes(self):
+        defect = self.site.defect_with_label('B')
+        defect.fixed = True
+        defect.mole_fraction = 0.25
+        np.testing.assert_equal(self.site._mobile_mask, np.array([True, False]))
+        np.testing.assert_equal(self.site._mole_fractions, np.array([0.1, 0.25]))
+        self.assertEqual(self.site.fixed_defects, (defect,))
+        self.assertEqual(self.site.mobile_defects, (self.site.defects[0],))
+        self.assertEqual(self.site.alpha, 0.75)
+
+    def test_charge_matches_without_numba(self):
+        self.site.defect_with_label('B').fixed = True
+        for phi in [-0.2, 0.0, 0.15]:
+            with patch('pyscses.site.NUMBA_AVAILABLE', False), patch('pyscses.site.aot_kernels', None):
+                expected = self.site.charge(phi=phi, temp=298.0)
+            self.assertAlmostEqual(self.site.charge(phi=phi, temp=298.0) / fundamental_charge,
+                                   expected / fundamental_charge, places=14)
+
+    def test_charge_follows_changes_to_valence_and_scaling(self):
+        self.site.valence = 1.0
+        self.site.scaling = np.array([0.5, 2.0])
+        expected = ((2.0 * 0.5 * self.site.probabilities(phi=0.1, temp=298.0)['A'] +
+                     -1.0 * 2.0 * self.site.probabilities(phi=0.1, temp=298.0)['B'] + 1.0))
+        for kernels, numba_available in [(aot_kernels, True), (None, True), (None, False)]:
+            with patch('pyscses.site.NUMBA_AVAILABLE', numba_available), patch('pyscses.site.aot_kernels', kernels):
+                self.assertAlmostEqual(self.site.charge(phi=0.1, temp=298.0) / fundamental_charge,
+                                       expected, places=14)
+
+    def test_charge_with_only_fixed_defects(self):
+        # All the defects are fixed and fill the site, so alpha is zero.
+        site = Site(label='X',
+                    x=1.5,
+                    defect_species=[DefectSpecies(label='A', valence=2.0, mole_fraction=0.5, fixed=True)],
+                    defect_energies=[0.0],
+                    saturation_parameter=0.5)
+        self.assertEqual(site.alpha, 0.0)
+        for kernels, numba_available in [(aot_kernels, True), (None, True), (None, False)]:
+            with patch('pyscses.site.NUMBA_AVAILABLE', numba_available), patch('pyscses.site.aot_kernels', kernels):
+                self.assertAlmostEqual(site.charge(phi=0.1, temp=300.0) / fundamental_charge, 1.0, places=14)
+
+    def test_charge_follows_changes_to_defects(self):
+        self.site.scaling = np.array([0.5, 2.0])
+        self.site.defect_with_label('A').valence = 3.0
+        expected = ((3.0 * 0.5 * self.site.probabilities(phi=0.1, temp=298.0)['A'] +
+                     -1.0 * 2.0 * self.site.probabilities(phi=0.1, temp=298.0)['B']))
+        with patch('pyscses.site.NUMBA_AVAILABLE', False), patch('pyscses.site.aot_kernels', None):
+            self.assertAlmostEqual(self.site.charge(phi=0.1, temp=298.0) / fundamental_charge,
+                                   expected, places=14)
+
+    def test_probabilities_as_list_warns_once(self):
+        with patch('pyscses.site._probabilities_as_list_warned', False):
+            with self.assertWarns(DeprecationWarning):
+                p = self.site.probabilities_as_list(phi=0.1, temp=298.0)
+            with warnings.catch_warnings():
+                warnings.simplefilter('error')
+                self.site.probabilities_as_list(phi=0.1, temp=298.0)
+        np.testing.assert_equal(p, self.site._probabilities_array(phi=0.1, temp=298.0))
+
+    def test_reset_saturation_parameter(self):
+        self.site.defect_with_label('B').fixed = True
+        p1 = self.site.probabilities(phi=0.1, temp=298.0)
+        self.site.reset_saturation_parameter(0.5)
+        self.assertEqual(self.site.saturation_parameter, 0.5)
+        self.assertAlmostEqual(self.site.alpha, 0.3)
+        p2 = self.site.probabilities(phi=0.1, temp=298.0)
+        self.assertNotEqual(p1['A'], p2['A'])
+        self.assertEqual(p2['B'], 0.2)
+
+    def test_site_has_no_instance_dict(self):
+        self.assertFalse(hasattr(self.site, '__dict__'))
+        with self.assertRaises(AttributeError):
+            self.site.foo = 'bar'
+
+    def test_lazy_site_matches_site(self):
+        lazy_site = Site(label='X',
+                         x=1.5,
+                         defect_species=self.site.defect_species,
+                         defect_energies=[-0.2, +0.3],
+                         lazy=True)
+        self.assertIsNone(lazy_site._defects)
+        for attribute in ['_valences', '_mole_fractions', '_energies', '_mobile_mask']:
+            np.testing.assert_equal(getattr(lazy_site, attribute), getattr(self.site, attribute))
+        self.assertEqual(lazy_site.alpha, self.site.alpha)
+        self.assertEqual(lazy_site.charge(phi=0.1, temp=298.0), self.site.charge(phi=0.1, temp=298.0))
+        self.assertIsNone(lazy_site._defects)
+
+    def test_lazy_site_creates_defects_when_needed(self):
+        lazy_site = Site(label='X',
+                         x=1.5,
+                         defect_species=self.site.defect_species,
+                         defect_energies=[-0.2, +0.3],
+                         lazy=True)
+        defect = lazy_site.defect_with_label('B')
+        self.assertIsInstance(defect, DefectAtSite)
+        self.assertEqual(defect.energy, 0.3)
+        self.assertEqual(lazy_site.defects[1], defect)
+        defect.fixed = True
+        np.testing.assert_equal(lazy_site._mobile_mask, np.array([True, False]))
+
+    def test_lazy_site_keeps_alpha_when_creating_defects(self):
+        lazy_site = Site(label='X',
+                         x=1.5,
+                         defect_species=self.site.defect_species,
+                         defect_energies=[-0.2, +0.3],
+                         lazy=True)
+        lazy_site.alpha = 0.5
+        version = lazy_site._version
+        lazy_site.defect_with_label('A')
+        self.assertEqual(lazy_site.alpha, 0.5)
+        self.assertEqual(lazy_site._version, version)
+
+    def test_defect_with_label_is_updated_when_a_label_changes(self):
+        defect = self.site.defect_with_label('A')
+        defect.label = 'C'
+        self.assertEqual(self.site.defect_with_label('C'), defect)
+        with self.assertRaises(LabelError):
+            self.site.defect_with_label('A')
+        self.assertEqual(list(self.site.probabilities(phi=0.0, temp=298.0)), ['C', 'B'])
+
+    def test_boltzmann_factors_array(self):
+        np.testing.assert_allclose(self.site._boltzmann_factors_array(phi=0.1, temp=298.0),
+                                   [d.boltzmann_factor(phi=0.1, temp=298.0) for d in self.site.defects],
+                                   rtol=1e-14)
+
+    def test_boltzmann_factors_are_reused_for_the_same_phi_and_temp(self):
+        # Site.charge only uses the cached factors on the NumPy path.
+        with patch.object(Site, '_boltzmann_factors_array', autospec=True,
+                          side_effect=Site._boltzmann_factors_array) as mock_boltzmann_factors_array, \
+             patch('pyscses.site.NUMBA_AVAILABLE', False), patch('pyscses.site.aot_kernels', None):
+            p1 = self.site.probabilities(phi=0.1, temp=298.0)
+            self.site.charge(phi=0.1, temp=298.0)
+            self.assertEqual(mock_boltzmann_factors_array.call_count, 1)
+            self.site.probabilities(phi=0.2, temp=298.0)
+            self.assertEqual(mock_boltzmann_factors_array.call_count, 2)
+            self.site.defect_with_label('B').mole_fraction = 0.3
+            p2 = self.site.probabilities(phi=0.2, temp=298.0)
+            self.assertEqual(mock_boltzmann_factors_array.call_count, 3)
+        self.assertNotEqual(p1, p2)
+
+    def test_probabilities_with_fixed_defect(self):
+        self.site.defect_with_label('A').fixed = True
+        p = self.site.probabilities(phi=0.1, temp=298.0)
+        boltzmann_factor = self.site.defect_with_label('B').boltzmann_factor(phi=0.1, temp=298.0)
+        self.assertEqual(p['A'], 0.1)
+        self.assertAlmostEqual(p['B'], 0.9 * 0.2 * boltzmann_factor / (0.9 + 0.2 * (boltzmann_factor - 1.0)),
+                               places=14)
+
+class TestChargesOfSites(unittest.TestCase):
+
+    def setUp(self):
+        a = DefectSpecies(label='A', valence=2.0, mole_fraction=0.1)
+        b = DefectSpecies(label='B', valence=-1.0, mole_fraction=0.2)
+        c = DefectSpecies(label='C', valence=1.0, mole_fraction=0.3, fixed=True)
+        self.sites = [Site('X', 0.0, [a, b], [-0.2, +0.3], valence=1.0),
+                      Site('Y', 1.0, [b], [0.1], scaling=np.array([0.5])),
+                      Site('Z', 2.0, [a, c], [0.0, -0.1])]
+        self.sites[2].defect_with_label('C').fixed = True
+        self.phi = np.array([0.05, -0.1, 0.2])
+
+    def test_defect_arrays_for_sites(self):
+        valences, mole_fractions, energies, mobile_mask, alpha, scaling, site_valences = defect_arrays_for_sites(self.sites)
+        np.testing.assert_equal(valences, np.array([[2.0, -1.0], [-1.0, 0.0], [2.0, 1.0]]))
+        np.testing.assert_equal(mole_fractions, np.array([[0.1, 0.2], [0.2, 0.0], [0.1, 0.3]]))
+        np.testing.assert_equal(energies, np.array([[-0.2, 0.3], [0.1, 0.0], [0.0, -0.1]]))
+        np.testing.assert_equal(mobile_mask, np.array([[True, True], [True, False], [True, False]]))
+        np.testing.assert_equal(scaling, np.array([[1.0, 1.0], [0.5, 0.0], [1.0, 1.0]]))
+        np.testing.assert_equal(alpha, np.array([1.0, 1.0, 0.7]))
+        np.testing.assert_equal(site_valences, np.array([1.0, 0.0, 0.0]))
+
+    def test_charges_of_sites(self):
+        expected = [site.charge(phi=phi, temp=298.0) for site, phi in zip(self.sites, self.phi)]
+        np.testing.assert_allclose(charges_of_sites(*defect_arrays_for_sites(self.sites), self.phi, 298.0),
+                                   expected, rtol=1e-12)
+
+    def test_charges_of_sites_without_numba(self):
+        expected = [site.charge(phi=phi, temp=298.0) for site, phi in zip(self.sites, self.phi)]
+        with patch('pyscses.site.NUMBA_AVAILABLE', False), patch('pyscses.site.aot_kernels', None):
+            np.testing.assert_allclose(charges_of_sites(*defect_arrays_for_sites(self.sites), self.phi, 298.0),
+                                       expected, rtol=1e-12)
+
+    def test_charges_of_sites_without_aot_kernels(self):
+        expected = [site.charge(phi=phi, temp=298.0) for site, phi in zip(self.sites, self.phi)]
+        with patch('pyscses.site.aot_kernels', None):
+            np.testing.assert_allclose(charges_of_sites(*defect_arrays_for_sites(self.sites), self.phi, 298.0),
+                                       expected, rtol=1e-12)
+
+    @unittest.skipUnless(NUMBA_AVAILABLE, 'Numba is not installed.')
+    def test_charges_of_sites_uses_the_parallel_kernel_with_numba(self):
+        with patch('pyscses.site.aot_kernels') as mock_aot_kernels:
+            charges_of_sites(*defect_arrays_for_sites(self.sites), self.phi, 298.0)
+        mock_aot_kernels.site_charges.assert_not_called()
+
+    def test_charges_of_sites_with_only_fixed_defects(self):
+        # All the defects at the last site are fixed and fill the site, so alpha is zero.
+        c = DefectSpecies(label='C', valence=1.0, mole_fraction=0.5, fixed=True)
+        self.sites.append(Site('W', 3.0, [c], [0.0], saturation_parameter=0.5))
+        phi = np.append(self.phi, 0.1)
+        expected = [site.charge(phi=phi, temp=298.0) for site, phi in zip(self.sites, phi)]
+        self.assertAlmostEqual(expected[-1] / fundamental_charge, 0.5, places=14)
+        for kernels, numba_available in [(aot_kernels, NUMBA_AVAILABLE), (None, NUMBA_AVAILABLE), (None, False)]:
+            with patch('pyscses.site.NUMBA_AVAILABLE', numba_available), patch('pyscses.site.aot_kernels', kernels), \
+                 warnings.catch_warnings():
+                warnings.simplefilter('error')
+                np.testing.assert_allclose(charges_of_sites(*defect_arrays_for_sites(self.sites), phi, 298.0),
+                                           expected, rtol=1e-12)
+                self.assertEqual(self.sites[-1].probabilities(phi=0.1, temp=298.0), {'C': 0.5})
+
 class TestSite(unittest.TestCase):
 
     def setUp(self):
@@ -139,6 +376,7 @@ class TestSite(unittest.TestCase):
     def test_defect_with_label(self):
         self.site.defects[0].label = 'foo'
         self.site.defects[1].label = 'bar'
+        self.site.update_defect_arrays()
         self.assertEqual(self.site.defect_with_label('foo'), self.site.defects[0])
         self.assertEqual(self.site.defect_with_label('bar'), self.site.defects[1])
 
@@ -146,6 +384,7 @@ class TestSite(unittest.TestCase):
         """Checks that defect_with_label() raises a LabelError if the argument does not match any of the defect labels for this site."""
         self.site.defects[0].label = 'foo'
         self.site.defects[1].label = 'bar'
+        self.site.update_defect_arrays()
         with self.assertRaises(LabelError):
             self.site.defect_with_label('banana')
 
@@ -155,44 +394,55 @@ class TestSite(unittest.TestCase):
         self.assertEqual(self.site.energies(), [-0.2, +0.2])
 
     def test_probabilities_one(self):
-        self.site.defects[0].boltzmann_factor = Mock(return_value=0.1)
         self.site.defects[0].mole_fraction = 0.2
         self.site.defects[0].label = 'A'
-        self.site.defects[1].boltzmann_factor = Mock(return_value=0.1)
         self.site.defects[1].mole_fraction = 0.1
         self.site.defects[1].label = 'B'
+        self.site.update_defect_arrays()
         exp_A = ((0.2*0.1/(1.0+(0.2*(0.1-1.0)+0.1*(0.1-1.0)))))
         exp_B= ((0.1*0.1/(1.0+(0.2*(0.1-1.0)+0.1*(0.1-1.0)))))
-        self.assertEqual(self.site.probabilities(phi=1.0,
-                                                 temp=298.0),
-                         {'A': exp_A, 'B': exp_B})
+        with patch.object(Site, '_boltzmann_factors_array', return_value=np.array([0.1, 0.1])):
+            self.assertEqual(self.site.probabilities(phi=1.0,
+                                                     temp=298.0),
+                             {'A': exp_A, 'B': exp_B})
 
     def test_probabilities_two(self):
-        self.site.defects[0].boltzmann_factor = Mock(return_value=0.1)
         self.site.defects[0].mole_fraction = 0.2
         self.site.defects[0].label = 'A'
         self.site.defects[0].fixed = True
-        self.site.alpha = 0.8
-        self.site.fixed_defects = (self.site.defects[0],)
-        self.site.defects[1].boltzmann_factor = Mock(return_value=0.1)
         self.site.defects[1].mole_fraction = 0.1
         self.site.defects[1].label = 'B'
-        self.site.mobile_defects = (self.site.defects[1],)
+        self.site.update_defect_arrays()
+        self.assertEqual(self.site.alpha, 0.8)
         exp_A = 0.2
         exp_B= 0.8*((0.1*0.1/(0.8+(0.1*(0.1-1.0)))))
-        self.assertEqual(self.site.probabilities(phi=1.0,
-                                                 temp=298.0),
-                         {'A': exp_A, 'B': exp_B})
+        with patch.object(Site, '_boltzmann_factors_array', return_value=np.array([0.1, 0.1])):
+            self.assertEqual(self.site.probabilities(phi=1.0,
+                                                     temp=298.0),
+                             {'A': exp_A, 'B': exp_B})
+
+    def test_defect_valences(self):
+        np.testing.assert_equal(self.site.defect_valences(), np.array([2.0, 1.0]))
+
+    def test_defect_valences_returns_a_copy(self):
+        self.site.defect_valences()[0] = 99.0
+        np.testing.assert_equal(self.site._valences, np.array([2.0, 1.0]))
 
     def test_charge(self):
-        self.site.probabilities = Mock(return_value={'E': 0.1, 'D': 0.2})
-        self.site.defects[0].valence = 1.0
-        self.site.defects[1].valence = 2.0
-        self.site.scaling = 0.5
-        self.site.valence = 1.0
-        expected_value = ((1.0*0.1 + 2.0*0.2)*0.5 + 1.0) * fundamental_charge
-        self.assertEqual(self.site.charge(phi=1.0, temp=298.0),
-                         expected_value)
+        with patch('pyscses.site.DefectAtSite', autospec=True) as mock_DefectAtSite:
+            mock_DefectAtSite.side_effect = create_mock_defects_at_site(2)
+            site = Site(label='A',
+                        x=1.5,
+                        defect_species=create_mock_defect_species(2),
+                        defect_energies=[-0.2, +0.2],
+                        scaling=[0.5, 0.5],
+                        valence=1.0)
+        expected_value = ((2.0*0.1 + 1.0*0.2)*0.5 + 1.0) * fundamental_charge
+        with patch.object(Site, '_probabilities_array', return_value=np.array([0.1, 0.2])), \
+             patch('pyscses.site.NUMBA_AVAILABLE', False), patch('pyscses.site.aot_kernels', None):
+            self.assertAlmostEqual(site.charge(phi=1.0, temp=298.0) / fundamental_charge,
+                                   expected_value / fundamental_charge,
+                                   places=14)
 
 
 if __name__ == '__main__':